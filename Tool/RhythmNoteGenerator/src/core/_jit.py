@@ -0,0 +1,11 @@
+"""
+Optional numba JIT compilation shared by the numeric kernels.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba ships with librosa, but keep a pure-Python fallback
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
@@ -3,14 +3,19 @@ Audio analysis module for rhythm game note generation.
 Handles beat detection, onset detection, and energy analysis.
 """
 
+import functools
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import librosa
+import soundfile as sf
 from dataclasses import dataclass
 from typing import Optional, Tuple, List
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class PitchNote:
     """A detected pitch/note from audio."""
     time: float       # Start time in seconds
@@ -21,40 +26,199 @@ class PitchNote:
     confidence: float # Detection confidence (0-1)
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioAnalysisResult:
-    """Result of audio analysis."""
+    """Result of audio analysis.
+
+    Per-frame and per-sample arrays (times, energy, waveform, features) are
+    float32; beat and onset times stay float64 since they become note times.
+    """
     # Basic info
     duration: float  # seconds
     sample_rate: int
     tempo: float  # BPM
 
-    # Beat and onset times (in seconds)
+    # Beat and onset times (in seconds, float64)
     beat_times: np.ndarray
     onset_times: np.ndarray
 
-    # Energy envelope
+    # Energy envelope (float32)
     times: np.ndarray
     energy: np.ndarray
 
-    # Raw audio data for waveform display
+    # Raw audio data for waveform display (float32)
     waveform: np.ndarray
-    waveform_sr: int
+    waveform_sr: float
 
     # Pitch detection results (optional)
     pitch_notes: Optional[list] = None  # List of PitchNote
 
+    # Extended features (optional, filled by AudioAnalyzer.analyze_all)
+    onset_strength: Optional[np.ndarray] = None  # Onset envelope aligned with `times`
+    spectral_features: Optional[dict] = None     # See AudioAnalyzer.get_spectral_features
+
+
+# Formats libsndfile decodes natively. Reading these through soundfile skips
+# librosa's audioread fallback; compressed formats like MP3 still go through librosa.
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg', '.aiff', '.aif'}
+
+# On-disk cache of analyze() results, so reopening a song skips beat/onset analysis
+CACHE_DIR = Path.home() / '.cache' / 'RhythmNoteGenerator'
+CACHE_VERSION = 1  # Bump when analysis output changes
+_CACHED_FIELDS = ('duration', 'sample_rate', 'tempo', 'beat_times', 'onset_times',
+                  'times', 'energy', 'waveform', 'waveform_sr')
+
+# On-disk cache of detect_pitches() results, stored as one column per PitchNote field
+PITCH_CACHE_SUFFIX = '.pitch.npz'
+PITCH_CACHE_VERSION = 1  # Bump when pitch detection output changes
+
+# Decoded PCM of formats slower to decode than to map from disk (cached as float32 .npy)
+PCM_CACHE_SUFFIX = '.pcm.npy'
+_UNCACHED_PCM_EXTENSIONS = {'.wav'}
+
+# Playback frames (int16, samples x channels) at the mixer's format, cached next to the PCM
+PLAYBACK_CACHE_SUFFIX = '.play.npy'
+
+
+def _pcm_cache_stem(path_str: str, mtime_ns: int) -> str:
+    """File name stem of the decoded PCM cache for a (path, modification time)."""
+    return hashlib.sha1(f"{path_str}|{mtime_ns}".encode('utf-8')).hexdigest()
+
+
+def _load_cached_pcm(stem: str) -> Optional[Tuple[np.ndarray, int]]:
+    """Memory-map cached decoded PCM, or None if missing or unreadable."""
+    for pcm_path in CACHE_DIR.glob(f"{stem}_*{PCM_CACHE_SUFFIX}"):
+        try:
+            sr = int(pcm_path.name[len(stem) + 1:-len(PCM_CACHE_SUFFIX)])
+            return np.asarray(np.load(pcm_path, mmap_mode='r')), sr
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _save_cached_pcm(stem: str, y: np.ndarray, sr: int):
+    """Write decoded PCM to the disk cache; failures are not fatal."""
+    pcm_path = CACHE_DIR / f"{stem}_{sr}{PCM_CACHE_SUFFIX}"
+    tmp_path = pcm_path.with_suffix('.tmp')
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            np.save(f, y.astype(np.float32, copy=False))
+        os.replace(tmp_path, pcm_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_audio_cached(path_str: str, mtime_ns: int,
+                       disk_cache: bool = False) -> Tuple[np.ndarray, int]:
+    """Decode an audio file once per (path, modification time).
+
+    With disk_cache, compressed formats are also decoded once across sessions:
+    the float32 PCM is saved under CACHE_DIR and memory-mapped on later loads.
+    The returned array is shared between callers, so it is marked read-only.
+    """
+    suffix = Path(path_str).suffix.lower()
+    stem = None
+    if disk_cache and suffix not in _UNCACHED_PCM_EXTENSIONS:
+        stem = _pcm_cache_stem(path_str, mtime_ns)
+        cached = _load_cached_pcm(stem)
+        if cached is not None:
+            return cached
+
+    y = None
+    if suffix in SOUNDFILE_EXTENSIONS:
+        try:
+            data, sr = sf.read(path_str, dtype='float32', always_2d=False)
+            y = data.mean(axis=1, dtype=np.float32) if data.ndim == 2 else data
+        except RuntimeError:
+            # Unsupported subtype (e.g. some compressed WAV variants) - let librosa handle it
+            y = None
+
+    if y is None:
+        y, sr = librosa.load(path_str, sr=None, mono=True)
+
+    y = np.ascontiguousarray(y)
+    y.setflags(write=False)
+    if stem is not None:
+        _save_cached_pcm(stem, y, sr)
+    return y, sr
+
+
+def _decode_playback(path_str: str, sample_rate: int) -> Tuple[np.ndarray, bool]:
+    """Decode to float32 frames (samples, file channels) at sample_rate.
+
+    Also returns whether decoding took more than a plain soundfile read
+    (librosa's fallback or resampling), i.e. whether the result is worth caching.
+    """
+    if Path(path_str).suffix.lower() in SOUNDFILE_EXTENSIONS:
+        try:
+            data, sr = sf.read(path_str, dtype='float32', always_2d=True)
+        except RuntimeError:
+            data = None
+        if data is not None:
+            if sr == sample_rate:
+                return data, False
+            return librosa.resample(data.T, orig_sr=sr, target_sr=sample_rate).T, True
+
+    y, _ = librosa.load(path_str, sr=sample_rate, mono=False)
+    return np.atleast_2d(y).T, True
+
 
 class AudioAnalyzer:
     """Analyzes audio files for rhythm game note generation."""
 
-    def __init__(self, hop_length: int = 512):
+    def __init__(self, hop_length: int = 512, n_fft: int = 2048,
+                 use_disk_cache: bool = True):
         self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.use_disk_cache = use_disk_cache
 
     def load_audio(self, file_path: str | Path) -> Tuple[np.ndarray, int]:
-        """Load audio file and return waveform and sample rate."""
-        y, sr = librosa.load(str(file_path), sr=None, mono=True)
-        return y, sr
+        """Load audio file and return waveform and sample rate.
+
+        Decoded audio is cached, so analysis passes over the same file share one load.
+        With the disk cache enabled, compressed formats also skip decoding on reopen.
+        """
+        path = Path(file_path).resolve()
+        return _load_audio_cached(str(path), path.stat().st_mtime_ns, self.use_disk_cache)
+
+    def load_playback_pcm(self, file_path: str | Path, sample_rate: int,
+                          channels: int) -> np.ndarray:
+        """Decode an audio file to C-contiguous int16 frames (samples, channels) for a mixer.
+
+        Files that need resampling or librosa's decoder are cached on disk
+        under the same key as the decoded PCM, so reopening them only maps the frames.
+        """
+        path = Path(file_path).resolve()
+        path_str = str(path)
+        cache_path = None
+        if self.use_disk_cache:
+            stem = _pcm_cache_stem(path_str, path.stat().st_mtime_ns)
+            cache_path = CACHE_DIR / f"{stem}_{sample_rate}x{channels}{PLAYBACK_CACHE_SUFFIX}"
+            try:
+                return np.load(cache_path, mmap_mode='r')
+            except (OSError, ValueError):
+                pass
+
+        frames, costly = _decode_playback(path_str, sample_rate)
+        np.clip(frames, -1.0, 1.0, out=frames)
+        if frames.shape[1] < channels:
+            frames = np.repeat(frames[:, :1], channels, axis=1)  # Mono file on a stereo mixer
+        else:
+            frames = frames[:, :channels]
+        frames = (frames * 32767).astype(np.int16, order='C')
+
+        if cache_path is not None and costly:
+            tmp_path = cache_path.with_suffix('.tmp')
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, frames)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+        return frames
 
     def analyze(self, file_path: str | Path,
                 progress_callback: Optional[callable] = None) -> AudioAnalysisResult:
@@ -64,18 +228,150 @@ class AudioAnalyzer:
             file_path: Path to audio file
             progress_callback: Optional callback(percent, message) for progress updates
         """
+        cache_path = self._analysis_cache_path(file_path)
+        if cache_path is not None:
+            result = self._load_cached_result(cache_path)
+            if result is not None:
+                if progress_callback:
+                    progress_callback(95, "Loaded cached analysis...")
+                return result
+
         if progress_callback:
             progress_callback(5, "Loading audio file...")
 
         # Load audio
         y, sr = self.load_audio(file_path)
+        result = self._analyze_from_array(y, sr, progress_callback)
+
+        if cache_path is not None:
+            self._save_cached_result(cache_path, result)
+        return result
+
+    def _analysis_cache_path(self, file_path: str | Path) -> Optional[Path]:
+        """Disk cache file of analyze() results for a file, or None with the cache off."""
+        if not self.use_disk_cache:
+            return None
+        return CACHE_DIR / f"{self._cache_key(file_path)}.npz"
+
+    def _pitch_cache_path(self, file_path: str | Path, method: str = "pyin",
+                          fmin: float = 65.0, fmax: float = 2100.0,
+                          min_duration: float = 0.05) -> Optional[Path]:
+        """Disk cache file of detect_pitches() results, or None with the cache off."""
+        if not self.use_disk_cache:
+            return None
+        settings = f"pitch|{method}|{fmin!r}|{fmax!r}|{min_duration!r}|{PITCH_CACHE_VERSION}"
+        return CACHE_DIR / f"{self._cache_key(file_path, settings)}{PITCH_CACHE_SUFFIX}"
+
+    def _cache_key(self, file_path: str | Path, extra: str = "") -> str:
+        """Disk cache key for a file: its path, modification time and analysis settings.
+
+        extra distinguishes results of other passes over the same file (e.g. pitch settings).
+        """
+        path = Path(file_path).resolve()
+        key = f"{path}|{path.stat().st_mtime_ns}|{self.hop_length}|{self.n_fft}|{CACHE_VERSION}"
+        if extra:
+            key = f"{key}|{extra}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _load_cached_result(cache_path: Path) -> Optional[AudioAnalysisResult]:
+        """Load a cached analysis result, or None if missing or unreadable."""
+        try:
+            with np.load(cache_path) as data:
+                fields = {name: data[name] for name in _CACHED_FIELDS}
+        except (OSError, KeyError, ValueError):
+            return None
+
+        for name in ('duration', 'tempo', 'waveform_sr'):
+            fields[name] = float(fields[name])
+        fields['sample_rate'] = int(fields['sample_rate'])
+        return AudioAnalysisResult(**fields)
+
+    @staticmethod
+    def _save_cached_result(cache_path: Path, result: AudioAnalysisResult):
+        """Write an analysis result to the disk cache; failures are not fatal."""
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **{name: getattr(result, name) for name in _CACHED_FIELDS})
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _load_cached_pitches(cache_path: Path) -> Optional[List[PitchNote]]:
+        """Load cached pitch detection results, or None if missing or unreadable."""
+        try:
+            with np.load(cache_path) as data:
+                columns = [data[name].tolist() for name in PitchNote.__slots__]
+        except (OSError, KeyError, ValueError):
+            return None
+        return [PitchNote(*fields) for fields in zip(*columns)]
+
+    @staticmethod
+    def _save_cached_pitches(cache_path: Path, notes: List[PitchNote]):
+        """Write pitch detection results to the disk cache; failures are not fatal."""
+        columns = {
+            'time': np.array([n.time for n in notes], dtype=np.float64),
+            'duration': np.array([n.duration for n in notes], dtype=np.float64),
+            'frequency': np.array([n.frequency for n in notes], dtype=np.float64),
+            'midi_note': np.array([n.midi_note for n in notes], dtype=np.int32),
+            'note_name': np.array([n.note_name for n in notes], dtype=np.str_),
+            'confidence': np.array([n.confidence for n in notes], dtype=np.float64),
+        }
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **columns)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def clear_cache():
+        """Delete all cached analysis results, pitch detections and decoded audio."""
+        if not CACHE_DIR.is_dir():
+            return
+        for pattern in ('*.npz', f'*{PCM_CACHE_SUFFIX}', f'*{PLAYBACK_CACHE_SUFFIX}'):
+            for path in CACHE_DIR.glob(pattern):
+                path.unlink(missing_ok=True)
+
+    def _stft_magnitude(self, y: np.ndarray) -> np.ndarray:
+        """Magnitude spectrogram shared by the spectral analysis passes."""
+        return np.abs(librosa.stft(y, n_fft=self.n_fft, hop_length=self.hop_length))
+
+    def _onset_mel_db(self, S: np.ndarray, sr: int) -> np.ndarray:
+        """Log-power mel spectrogram, as librosa's onset_strength builds it from audio."""
+        mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_fft=self.n_fft,
+                                             hop_length=self.hop_length)
+        return librosa.power_to_db(mel)
+
+    def _analyze_from_array(self, y: np.ndarray, sr: int,
+                            progress_callback: Optional[callable] = None,
+                            S: Optional[np.ndarray] = None) -> AudioAnalysisResult:
+        """Perform full analysis on already-loaded audio.
+
+        S is an optional precomputed magnitude spectrogram (see _stft_magnitude).
+        """
         duration = librosa.get_duration(y=y, sr=sr)
 
         if progress_callback:
             progress_callback(20, "Detecting tempo and beats...")
 
+        # Beat tracking and onset detection both derive from the same mel spectrogram
+        if S is None:
+            S = self._stft_magnitude(y)
+        mel_db = self._onset_mel_db(S, sr)
+
         # Detect tempo and beats
-        tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr, hop_length=self.hop_length)
+        beat_envelope = librosa.onset.onset_strength(
+            S=mel_db, sr=sr, hop_length=self.hop_length, aggregate=np.median
+        )
+        tempo, beat_frames = librosa.beat.beat_track(
+            onset_envelope=beat_envelope, sr=sr, hop_length=self.hop_length
+        )
         beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=self.hop_length)
 
         # Handle tempo as array (newer librosa versions)
@@ -86,8 +382,9 @@ class AudioAnalyzer:
             progress_callback(45, "Detecting onsets...")
 
         # Detect onsets
+        onset_envelope = librosa.onset.onset_strength(S=mel_db, sr=sr, hop_length=self.hop_length)
         onset_frames = librosa.onset.onset_detect(
-            y=y, sr=sr, hop_length=self.hop_length,
+            onset_envelope=onset_envelope, sr=sr, hop_length=self.hop_length,
             backtrack=True
         )
         onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=self.hop_length)
@@ -96,24 +393,24 @@ class AudioAnalyzer:
             progress_callback(65, "Calculating energy envelope...")
 
         # Calculate energy envelope (RMS)
+        # Computed from samples: RMS from the spectrogram would be windowed and shift the envelope
         rms = librosa.feature.rms(y=y, hop_length=self.hop_length)[0]
         times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=self.hop_length)
+        times = times.astype(np.float32)
 
         # Normalize energy
         if rms.max() > 0:
             energy = rms / rms.max()
         else:
             energy = rms
+        energy = energy.astype(np.float32, copy=False)
 
         if progress_callback:
             progress_callback(80, "Preparing waveform display...")
 
         # Downsample waveform for display (keep it manageable)
-        display_sr = min(sr, 22050)
-        if sr != display_sr:
-            waveform = librosa.resample(y, orig_sr=sr, target_sr=display_sr)
-        else:
-            waveform = y
+        waveform = self._display_waveform(y, sr)
+        display_sr = len(waveform) / duration if duration > 0 else float(sr)
 
         if progress_callback:
             progress_callback(95, "Finalizing analysis...")
@@ -135,33 +432,75 @@ class AudioAnalyzer:
 
         return result
 
+    @staticmethod
+    def _display_waveform(y: np.ndarray, sr: int, target_sr: int = 22050,
+                          target_points: int = 8000) -> np.ndarray:
+        """Decimate a waveform for display, keeping per-bin min/max peaks.
+
+        Each bin contributes its min and max sample, so the output rate is
+        about target_sr while the visual envelope of the signal is preserved.
+        """
+        n_points = max(target_points, int(len(y) * target_sr / sr))
+        bin_size = max(1, (2 * len(y)) // n_points)
+        if bin_size <= 2:
+            return y.astype(np.float32, copy=False)
+
+        bins = y[:len(y) // bin_size * bin_size].reshape(-1, bin_size)
+        peaks = np.empty((bins.shape[0], 2), dtype=np.float32)
+        peaks[:, 0] = bins.min(axis=1)
+        peaks[:, 1] = bins.max(axis=1)
+        return peaks.ravel()
+
     def get_onset_strengths(self, file_path: str | Path) -> Tuple[np.ndarray, np.ndarray]:
         """Get onset strength envelope for more detailed analysis."""
         y, sr = self.load_audio(file_path)
-        onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=self.hop_length)
+        return self._onset_strengths_from_array(y, sr)
+
+    def _onset_strengths_from_array(self, y: np.ndarray, sr: int,
+                                    S: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get onset strength envelope from already-loaded audio."""
+        if S is None:
+            S = self._stft_magnitude(y)
+        onset_env = librosa.onset.onset_strength(
+            S=self._onset_mel_db(S, sr), sr=sr, hop_length=self.hop_length
+        )
         times = librosa.frames_to_time(np.arange(len(onset_env)), sr=sr, hop_length=self.hop_length)
-        return times, onset_env
+        return times.astype(np.float32), onset_env.astype(np.float32, copy=False)
 
     def get_spectral_features(self, file_path: str | Path) -> dict:
         """Extract spectral features for advanced note placement."""
         y, sr = self.load_audio(file_path)
+        return self._spectral_features_from_array(y, sr)
+
+    def _spectral_features_from_array(self, y: np.ndarray, sr: int,
+                                      S: Optional[np.ndarray] = None) -> dict:
+        """Extract spectral features from already-loaded audio.
+
+        One STFT is shared by all features: centroid and bandwidth take the
+        magnitude spectrogram, the mel bands take its power.
+        """
+        if S is None:
+            S = self._stft_magnitude(y)
 
         # Spectral centroid (brightness)
-        centroid = librosa.feature.spectral_centroid(y=y, sr=sr, hop_length=self.hop_length)[0]
+        centroid = librosa.feature.spectral_centroid(S=S, sr=sr, n_fft=self.n_fft,
+                                                     hop_length=self.hop_length)[0]
 
         # Spectral bandwidth
-        bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr, hop_length=self.hop_length)[0]
+        bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr, n_fft=self.n_fft,
+                                                       hop_length=self.hop_length)[0]
 
         # Mel-frequency bands for lane assignment
-        mel_spec = librosa.feature.melspectrogram(y=y, sr=sr, hop_length=self.hop_length, n_mels=6)
+        mel_spec = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_fft=self.n_fft,
+                                                  hop_length=self.hop_length, n_mels=6)
 
         times = librosa.frames_to_time(np.arange(mel_spec.shape[1]), sr=sr, hop_length=self.hop_length)
 
         return {
-            'times': times,
-            'centroid': centroid,
-            'bandwidth': bandwidth,
-            'mel_bands': mel_spec  # 6 bands for 6-key mapping
+            'times': times.astype(np.float32),
+            'centroid': centroid.astype(np.float32, copy=False),
+            'bandwidth': bandwidth.astype(np.float32, copy=False),
+            'mel_bands': mel_spec.astype(np.float32, copy=False)  # 6 bands for 6-key mapping
         }
 
     def detect_pitches(self, file_path: str | Path,
@@ -184,11 +523,34 @@ class AudioAnalyzer:
         Returns:
             List of PitchNote objects
         """
+        cache_path = self._pitch_cache_path(file_path, method, fmin, fmax, min_duration)
+        if cache_path is not None:
+            notes = self._load_cached_pitches(cache_path)
+            if notes is not None:
+                if progress_callback:
+                    progress_callback(95, "Loaded cached pitch detection...")
+                return notes
+
         if progress_callback:
             progress_callback(5, "Loading audio file...")
 
         y, sr = self.load_audio(file_path)
+        notes = self._detect_pitches_from_array(
+            y, sr, fmin=fmin, fmax=fmax, min_duration=min_duration,
+            method=method, progress_callback=progress_callback
+        )
+
+        if cache_path is not None:
+            self._save_cached_pitches(cache_path, notes)
+        return notes
 
+    def _detect_pitches_from_array(self, y: np.ndarray, sr: int,
+                                   fmin: float = 65.0,
+                                   fmax: float = 2100.0,
+                                   min_duration: float = 0.05,
+                                   method: str = "pyin",
+                                   progress_callback: Optional[callable] = None) -> List[PitchNote]:
+        """Detect pitches from already-loaded audio. See detect_pitches for arguments."""
         if method == "hpss_pyin":
             # Harmonic-Percussive Source Separation + PYIN
             # Better for music with drums/percussion
@@ -279,57 +641,7 @@ class AudioAnalyzer:
         times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=self.hop_length)
 
         # Convert to notes by grouping consecutive similar pitches
-        notes = []
-        current_note = None
-        current_start = None
-        current_freqs = []
-        current_probs = []
-
-        for i, (time, freq, voiced, prob) in enumerate(zip(times, f0, voiced_flag, voiced_probs)):
-            if voiced and not np.isnan(freq):
-                midi = librosa.hz_to_midi(freq)
-
-                if current_note is None:
-                    # Start new note
-                    current_note = round(midi)
-                    current_start = time
-                    current_freqs = [freq]
-                    current_probs = [prob]
-                elif abs(round(midi) - current_note) <= 0.5:
-                    # Continue same note
-                    current_freqs.append(freq)
-                    current_probs.append(prob)
-                else:
-                    # Different note - save current and start new
-                    duration = time - current_start
-                    if duration >= min_duration:
-                        notes.append(self._create_pitch_note(
-                            current_start, duration, current_freqs, current_probs
-                        ))
-                    current_note = round(midi)
-                    current_start = time
-                    current_freqs = [freq]
-                    current_probs = [prob]
-            else:
-                # Unvoiced - end current note if exists
-                if current_note is not None:
-                    duration = time - current_start
-                    if duration >= min_duration:
-                        notes.append(self._create_pitch_note(
-                            current_start, duration, current_freqs, current_probs
-                        ))
-                    current_note = None
-                    current_start = None
-                    current_freqs = []
-                    current_probs = []
-
-        # Handle last note
-        if current_note is not None:
-            duration = times[-1] - current_start
-            if duration >= min_duration:
-                notes.append(self._create_pitch_note(
-                    current_start, duration, current_freqs, current_probs
-                ))
+        notes = self._group_pitch_frames(times, f0, voiced_flag, voiced_probs, min_duration)
 
         if progress_callback:
             progress_callback(95, f"Found {len(notes)} notes, finalizing...")
@@ -339,8 +651,41 @@ class AudioAnalyzer:
 
         return notes
 
+    def _group_pitch_frames(self, times: np.ndarray, f0: np.ndarray,
+                            voiced_flag: np.ndarray, voiced_probs: np.ndarray,
+                            min_duration: float) -> List[PitchNote]:
+        """Group consecutive voiced frames with the same rounded MIDI pitch into notes.
+
+        Segment boundaries are found with vectorized run-length detection, so the
+        Python-level work is per note rather than per frame.
+        """
+        if len(f0) == 0:
+            return []
+
+        valid = np.asarray(voiced_flag, dtype=bool) & np.isfinite(f0)
+        if not valid.any():
+            return []
+
+        midi = librosa.hz_to_midi(np.where(valid, f0, 1.0))
+        rounded = np.rint(midi).astype(np.int32)
+        pitch_change = rounded[1:] != rounded[:-1]
+
+        # A segment starts where the previous frame is unvoiced or has another pitch,
+        # and ends (exclusive) where the next frame is unvoiced or has another pitch
+        starts = np.flatnonzero(valid & np.concatenate(([True], ~valid[:-1] | pitch_change)))
+        ends = np.flatnonzero(valid & np.concatenate((~valid[1:] | pitch_change, [True]))) + 1
+
+        # A note lasts until the frame that ended it (or the last frame of the track)
+        durations = times[np.minimum(ends, len(times) - 1)] - times[starts]
+        keep = durations >= min_duration
+
+        return [
+            self._create_pitch_note(times[s], duration, f0[s:e], voiced_probs[s:e])
+            for s, e, duration in zip(starts[keep], ends[keep], durations[keep])
+        ]
+
     def _create_pitch_note(self, start_time: float, duration: float,
-                           frequencies: List[float], probabilities: List[float]) -> PitchNote:
+                           frequencies: np.ndarray, probabilities: np.ndarray) -> PitchNote:
         """Create a PitchNote from accumulated data."""
         avg_freq = np.median(frequencies)  # Use median for stability
         avg_prob = np.mean(probabilities)
@@ -357,7 +702,71 @@ class AudioAnalyzer:
         )
 
     def analyze_with_pitch(self, file_path: str | Path) -> AudioAnalysisResult:
-        """Perform full analysis including pitch detection."""
-        result = self.analyze(file_path)
-        result.pitch_notes = self.detect_pitches(file_path)
+        """Perform full analysis including pitch detection.
+
+        Beat/onset analysis and pitch tracking are independent once the audio
+        is loaded, so they run on two threads (librosa/NumPy release the GIL).
+        Results found in the analyze() and detect_pitches() disk caches are reused.
+        """
+        result, pitch_notes, analysis_cache, pitch_cache = self._load_cached_passes(file_path)
+        if result is not None and pitch_notes is not None:
+            result.pitch_notes = pitch_notes
+            return result
+
+        y, sr = self.load_audio(file_path)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pitch_future = None
+            if pitch_notes is None:
+                pitch_future = executor.submit(self._detect_pitches_from_array, y, sr)
+            if result is None:
+                result = self._analyze_from_array(y, sr)
+                if analysis_cache is not None:
+                    self._save_cached_result(analysis_cache, result)
+            if pitch_future is not None:
+                pitch_notes = pitch_future.result()
+                if pitch_cache is not None:
+                    self._save_cached_pitches(pitch_cache, pitch_notes)
+        result.pitch_notes = pitch_notes
         return result
+
+    def analyze_all(self, file_path: str | Path) -> AudioAnalysisResult:
+        """Perform full analysis plus pitch, onset strength and spectral features.
+
+        The audio is decoded and transformed (STFT) once and shared by every analysis pass.
+        Results found in the analyze() and detect_pitches() disk caches are reused.
+        """
+        result, pitch_notes, analysis_cache, pitch_cache = self._load_cached_passes(file_path)
+
+        y, sr = self.load_audio(file_path)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # pyin does its own framing, so it can run alongside the STFT passes
+            pitch_future = None
+            if pitch_notes is None:
+                pitch_future = executor.submit(self._detect_pitches_from_array, y, sr)
+            S = self._stft_magnitude(y)
+            if result is None:
+                result = self._analyze_from_array(y, sr, S=S)
+                if analysis_cache is not None:
+                    self._save_cached_result(analysis_cache, result)
+            _, result.onset_strength = self._onset_strengths_from_array(y, sr, S=S)
+            result.spectral_features = self._spectral_features_from_array(y, sr, S=S)
+            if pitch_future is not None:
+                pitch_notes = pitch_future.result()
+                if pitch_cache is not None:
+                    self._save_cached_pitches(pitch_cache, pitch_notes)
+        result.pitch_notes = pitch_notes
+        return result
+
+    def _load_cached_passes(self, file_path: str | Path) -> tuple:
+        """Look up the analyze() and default detect_pitches() results in the disk cache.
+
+        Returns (result or None, pitch notes or None, analysis cache path, pitch cache path);
+        the paths are None with the disk cache off.
+        """
+        analysis_cache = self._analysis_cache_path(file_path)
+        pitch_cache = self._pitch_cache_path(file_path)
+        result = pitch_notes = None
+        if analysis_cache is not None:
+            result = self._load_cached_result(analysis_cache)
+            pitch_notes = self._load_cached_pitches(pitch_cache)
+        return result, pitch_notes, analysis_cache, pitch_cache
@@ -4,10 +4,58 @@ Generates playable note patterns from audio analysis.
 """
 
 import numpy as np
+from scipy.signal import find_peaks
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import List, Optional
 from enum import IntEnum
 from .audio_analyzer import AudioAnalysisResult
+from ._jit import njit
+
+
+@njit(cache=True)
+def _thin_by_interval(times: np.ndarray, min_interval: float) -> np.ndarray:
+    """Keep times that are at least min_interval after the previously kept time."""
+    if len(times) == 0:
+        return times
+    out = np.empty_like(times)
+    out[0] = times[0]
+    k = 1
+    for i in range(1, len(times)):
+        if times[i] - out[k - 1] >= min_interval:
+            out[k] = times[i]
+            k += 1
+    return out[:k]
+
+
+def _enforce_min_interval(times: np.ndarray, min_interval: float) -> np.ndarray:
+    """Greedy min-interval thinning of sorted times, skipping already-spaced prefixes.
+
+    Times before the first gap shorter than min_interval are always kept, so only
+    the remainder goes through the sequential thinner (often nothing at all).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) < 2:
+        return times
+    too_close = np.diff(times) < min_interval
+    if not too_close.any():
+        return times
+    first = int(np.argmax(too_close))
+    return np.concatenate((times[:first], _thin_by_interval(times[first:], min_interval)))
+
+
+def _round_to_list(values: np.ndarray, ndigits: int) -> List[float]:
+    """Round an array to native floats, matching Python's round() exactly.
+
+    np.round only disagrees with round() on decimal ties (e.g. 0.00005),
+    so just those values are re-rounded in Python.
+    """
+    out = np.round(values, ndigits).tolist()
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie).tolist():
+        out[i] = round(float(values[i]), ndigits)
+    return out
 
 
 class Difficulty(IntEnum):
@@ -19,7 +67,7 @@ class Difficulty(IntEnum):
     MASTER = 5
 
 
-@dataclass
+@dataclass(slots=True)
 class Note:
     """A single note in the rhythm game."""
     time: float      # Time in seconds
@@ -35,7 +83,61 @@ class Note:
         }
 
 
+# Chart note order (time, then lane) as a C-level key for list.sort
+NOTE_SORT_KEY = attrgetter('time', 'lane')
+
+
 @dataclass
+class NoteArray:
+    """Notes stored as parallel arrays (structure of arrays) for vectorized processing.
+
+    Used by the generation pipeline; charts expose editable Note objects.
+    Times and durations stay float64 seconds rather than integer ticks: exports
+    write them to 0.1 ms and imported charts must round-trip their exact values.
+    """
+    times: np.ndarray      # Times in seconds (float64)
+    lanes: np.ndarray      # Lane numbers (int8)
+    durations: np.ndarray  # Hold durations in seconds, 0 for tap notes (float64)
+    # Bumped when the arrays are edited in place; key derived caches on (arrays, version)
+    version: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        self.times = np.asarray(self.times, dtype=np.float64)
+        self.lanes = np.asarray(self.lanes, dtype=np.int8)
+        self.durations = np.asarray(self.durations, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def empty(cls) -> 'NoteArray':
+        """Create an array with no notes."""
+        return cls(np.empty(0), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_notes(cls, notes: List[Note]) -> 'NoteArray':
+        """Build arrays from a list of Note objects."""
+        count = len(notes)
+        return cls(
+            np.fromiter((n.time for n in notes), dtype=np.float64, count=count),
+            np.fromiter((n.lane for n in notes), dtype=np.int8, count=count),
+            np.fromiter((n.duration for n in notes), dtype=np.float64, count=count),
+        )
+
+    def to_notes(self) -> List[Note]:
+        """Convert to a list of Note objects (Python native types)."""
+        return [
+            Note(time=t, lane=l, duration=d)
+            for t, l, d in zip(self.times.tolist(), self.lanes.tolist(), self.durations.tolist())
+        ]
+
+    def sorted(self) -> 'NoteArray':
+        """Return a copy sorted by (time, lane)."""
+        order = np.lexsort((self.lanes, self.times))
+        return NoteArray(self.times[order], self.lanes[order], self.durations[order])
+
+
+@dataclass(slots=True)
 class NoteChart:
     """A complete note chart for a song."""
     # Metadata
@@ -56,6 +158,86 @@ class NoteChart:
     # Notes
     notes: List[Note] = field(default_factory=list)
 
+    # Cached (notes list, length, NoteArray) behind note_arrays()
+    _array_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def note_count(self) -> int:
+        """Number of notes in the chart."""
+        return len(self.notes)
+
+    @property
+    def density(self) -> Optional[float]:
+        """Notes per second over the song, or None when the duration is unknown."""
+        if self.duration <= 0:
+            return None
+        return len(self.notes) / self.duration
+
+    def note_arrays(self) -> NoteArray:
+        """Get the notes as parallel arrays for vectorized processing.
+
+        The arrays are cached until `notes` is replaced or changes length; call
+        invalidate_arrays() after editing notes in place, or use insert_note(),
+        pop_note() and note_changed() to keep the cache current.
+        """
+        arrays = self._cached_arrays()
+        if arrays is None:
+            arrays = NoteArray.from_notes(self.notes)
+            self._array_cache = (self.notes, len(self.notes), arrays)
+        return arrays
+
+    def _cached_arrays(self) -> Optional[NoteArray]:
+        """The cached arrays if they still describe `notes`, else None."""
+        cache = self._array_cache
+        if cache is not None and cache[0] is self.notes and cache[1] == len(self.notes):
+            return cache[2]
+        return None
+
+    def insert_note(self, index: int, note: Note):
+        """Insert a note at index, updating the cached arrays rather than dropping them."""
+        arrays = self._cached_arrays()
+        self.notes.insert(index, note)
+        if arrays is not None:
+            arrays = NoteArray(np.insert(arrays.times, index, note.time),
+                               np.insert(arrays.lanes, index, note.lane),
+                               np.insert(arrays.durations, index, note.duration))
+            self._array_cache = (self.notes, len(self.notes), arrays)
+
+    def pop_note(self, index: int) -> Note:
+        """Remove and return the note at index, updating the cached arrays."""
+        arrays = self._cached_arrays()
+        note = self.notes.pop(index)
+        if arrays is not None:
+            arrays = NoteArray(np.delete(arrays.times, index),
+                               np.delete(arrays.lanes, index),
+                               np.delete(arrays.durations, index))
+            self._array_cache = (self.notes, len(self.notes), arrays)
+        return note
+
+    def note_changed(self, index: int):
+        """Update the cached arrays after the note at index was edited in place.
+
+        The arrays are written in place and their version is bumped, so caches
+        derived from them must check NoteArray.version as well as identity.
+        """
+        arrays = self._cached_arrays()
+        if arrays is None:
+            return
+        note = self.notes[index]
+        arrays.times[index] = note.time
+        arrays.lanes[index] = note.lane
+        arrays.durations[index] = note.duration
+        arrays.version += 1
+
+    def set_note_arrays(self, arrays: NoteArray):
+        """Replace the notes with the given arrays, keeping them as the cached form."""
+        self.notes = arrays.to_notes()
+        self._array_cache = (self.notes, len(self.notes), arrays)
+
+    def invalidate_arrays(self):
+        """Drop the cached note arrays (call after editing notes in place)."""
+        self._array_cache = None
+
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization."""
         return {
@@ -74,9 +256,20 @@ class NoteChart:
                 'difficulty': str(self.difficulty.name),
                 'difficulty_value': int(self.difficulty_value),
             },
-            'notes': [note.to_dict() for note in self.notes]
+            'notes': self._notes_to_dicts()
         }
 
+    def _notes_to_dicts(self) -> List[dict]:
+        """Serialize all notes at once (same output as Note.to_dict per note)."""
+        arrays = self.note_arrays()
+        times = _round_to_list(arrays.times, 4)
+        lanes = arrays.lanes.tolist()
+        durations = _round_to_list(arrays.durations, 4)
+        return [
+            {'time': t, 'lane': l, 'duration': d}
+            for t, l, d in zip(times, lanes, durations)
+        ]
+
 
 class NoteGenerator:
     """Generates note charts from audio analysis."""
@@ -93,6 +286,7 @@ class NoteGenerator:
             'pattern_complexity': 0.2,   # Lane variation
             'beat_weight': 1.0,          # Heavily prioritize beats
             'use_beats_only': True,      # Only use beat times for notes
+            'peak_picking': True,        # Keep the strongest note per min_interval
         },
         Difficulty.NORMAL: {
             'onset_threshold': 0.4,
@@ -102,6 +296,7 @@ class NoteGenerator:
             'pattern_complexity': 0.4,
             'beat_weight': 0.8,
             'use_beats_only': False,
+            'peak_picking': True,
         },
         Difficulty.HARD: {
             'onset_threshold': 0.25,
@@ -132,11 +327,20 @@ class NoteGenerator:
         },
     }
 
-    def __init__(self, num_keys: int = 4, difficulty: Difficulty = Difficulty.NORMAL):
+    def __init__(self, num_keys: int = 4, difficulty: Difficulty = Difficulty.NORMAL,
+                 seed: Optional[int] = None):
         self.num_keys = min(max(num_keys, 1), 6)  # Clamp to 1-6
         self.difficulty = difficulty
         self.params = self.DIFFICULTY_PARAMS[difficulty]
 
+        # Single random source for the generator; pass a seed for reproducible charts
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+
+        # Pattern weights between every pair of lanes (closer lanes weigh more)
+        lane_ids = np.arange(self.num_keys)
+        self._inv_dist = 1.0 / (1.0 + np.abs(lane_ids[:, None] - lane_ids[None, :]))
+
     def generate(self, analysis: AudioAnalysisResult,
                  title: str = "", artist: str = "", audio_file: str = "") -> NoteChart:
         """Generate a note chart from audio analysis."""
@@ -152,7 +356,7 @@ class NoteGenerator:
         # Calculate difficulty value (1-10 scale)
         difficulty_value = self._calculate_difficulty_value(notes, analysis.duration)
 
-        return NoteChart(
+        chart = NoteChart(
             title=title,
             artist=artist,
             audio_file=audio_file,
@@ -162,15 +366,15 @@ class NoteGenerator:
             num_keys=self.num_keys,
             difficulty=self.difficulty,
             difficulty_value=difficulty_value,
-            notes=notes
         )
+        chart.set_note_arrays(notes)
+        return chart
 
     def _filter_onsets(self, analysis: AudioAnalysisResult) -> np.ndarray:
         """Filter onset times based on difficulty threshold, beats, and minimum interval."""
         use_beats_only = self.params.get('use_beats_only', False)
         beat_weight = self.params.get('beat_weight', 0.5)
         threshold = self.params['onset_threshold']
-        min_interval = self.params['min_interval']
 
         # For easy difficulty, primarily use beat times
         if use_beats_only:
@@ -193,123 +397,169 @@ class NoteGenerator:
             # Prioritize beats by snapping nearby onsets to beat positions
             beat_tolerance = 60.0 / analysis.tempo * 0.25  # Within 1/4 beat
 
-            merged_times = []
-
-            # Add all beats first (they're the rhythm foundation)
-            for bt in beat_times:
-                merged_times.append(bt)
-
             # Add onsets that aren't too close to existing beats
-            for ot in onset_times:
-                is_near_beat = any(abs(ot - bt) < beat_tolerance for bt in beat_times)
-                if not is_near_beat:
-                    # Only add non-beat onsets based on beat_weight
-                    # Lower beat_weight = more non-beat onsets allowed
-                    if np.random.random() > beat_weight:
-                        merged_times.append(ot)
+            off_beat = onset_times[self._off_beat_mask(onset_times, beat_times, beat_tolerance)]
+
+            # Only add non-beat onsets based on beat_weight
+            # Lower beat_weight = more non-beat onsets allowed
+            off_beat = off_beat[self._rng.random(len(off_beat)) > beat_weight]
 
-            note_times = np.array(sorted(set(merged_times)))
+            # Beats are the rhythm foundation, so all of them are kept
+            note_times = np.unique(np.concatenate((beat_times, off_beat)))
 
         # Filter by minimum interval
-        if len(note_times) > 0:
-            filtered = [note_times[0]]
-            for t in note_times[1:]:
-                if t - filtered[-1] >= min_interval:
-                    filtered.append(t)
-            note_times = np.array(filtered)
+        note_times = self._space_notes(note_times, analysis)
 
         return note_times
 
+    def _space_notes(self, note_times: np.ndarray,
+                     analysis: AudioAnalysisResult) -> np.ndarray:
+        """Enforce the minimum interval between sorted note times.
+
+        With 'peak_picking' the strongest note in each window wins (beats get a
+        beat_weight bonus); otherwise the earliest note wins.
+        """
+        min_interval = self.params['min_interval']
+        frame_times = analysis.times
+        if (not self.params.get('peak_picking', False)
+                or len(note_times) < 2 or len(frame_times) < 2):
+            return _enforce_min_interval(note_times, min_interval)
+
+        note_times = np.asarray(note_times, dtype=np.float64)
+        frame_period = float(frame_times[-1]) / (len(frame_times) - 1)
+
+        # Note strength on the frame grid, padded so edge frames can be peaks
+        strength = np.interp(note_times, frame_times, analysis.energy)
+        strength += self.params.get('beat_weight', 0.5) * np.isin(note_times, analysis.beat_times)
+        frames = np.clip(np.rint(note_times / frame_period).astype(np.int64),
+                         0, len(frame_times) - 1) + 1
+
+        # Several notes can round to one frame: keep the strongest (the earliest on ties)
+        order = np.lexsort((-np.arange(len(frames)), strength, frames))
+        sorted_frames = frames[order]
+        winners = order[np.append(sorted_frames[1:] != sorted_frames[:-1], True)]
+
+        signal = np.full(len(frame_times) + 2, -1.0)
+        signal[frames[winners]] = strength[winners]
+        time_at_frame = np.zeros(len(signal))
+        time_at_frame[frames[winners]] = note_times[winners]
+
+        distance = max(1, int(np.ceil(min_interval / frame_period - 1e-6)))
+        peaks, _ = find_peaks(signal, distance=distance)
+        return _enforce_min_interval(time_at_frame[peaks], min_interval)
+
     def _assign_lanes(self, onset_times: np.ndarray,
-                      analysis: AudioAnalysisResult) -> List[Note]:
+                      analysis: AudioAnalysisResult) -> NoteArray:
         """Assign lanes to notes based on spectral content and patterns."""
-        notes = []
         if len(onset_times) == 0:
-            return notes
+            return NoteArray.empty()
 
         complexity = self.params['pattern_complexity']
         max_simultaneous = self.params['max_simultaneous']
 
+        # Preallocate for the largest possible chart and trim at the end
+        capacity = len(onset_times) * min(max_simultaneous, self.num_keys)
+        note_times = np.empty(capacity, dtype=np.float64)
+        note_lanes = np.empty(capacity, dtype=np.int8)
+        count = 0
+
+        # Draw all random numbers up front instead of one call per decision
+        num_onsets = len(onset_times)
+        chord_rolls = self._rng.random(num_onsets)
+        chord_sizes = self._rng.integers(1, max_simultaneous + 1, size=num_onsets)
+        pattern_rolls = self._rng.random((num_onsets, self.num_keys))
+        lane_rolls = self._rng.random((num_onsets, self.num_keys))
+
         # Track recent lanes to create playable patterns
         recent_lanes = []
 
         for i, time in enumerate(onset_times):
             # Determine number of simultaneous notes
             num_notes = 1
-            if max_simultaneous > 1 and np.random.random() < complexity * 0.3:
-                num_notes = min(np.random.randint(1, max_simultaneous + 1), self.num_keys)
+            if max_simultaneous > 1 and chord_rolls[i] < complexity * 0.3:
+                num_notes = min(int(chord_sizes[i]), self.num_keys)
 
-            # Choose lanes
-            available_lanes = list(range(self.num_keys))
+            # Choose lanes (taken lanes get zero weight)
+            available = np.ones(self.num_keys, dtype=bool)
             chosen_lanes = []
 
-            for _ in range(num_notes):
-                if not available_lanes:
+            for k in range(num_notes):
+                if not available.any():
                     break
 
                 # Prefer lanes that create smooth patterns
-                if recent_lanes and np.random.random() > complexity:
+                if recent_lanes and pattern_rolls[i, k] > complexity:
                     # Stay close to recent lanes
                     last_lane = recent_lanes[-1] if recent_lanes else self.num_keys // 2
-                    weights = [1.0 / (1 + abs(l - last_lane)) for l in available_lanes]
+                    weights = self._inv_dist[last_lane] * available
                 else:
                     # Random distribution
-                    weights = [1.0] * len(available_lanes)
+                    weights = available.astype(np.float64)
 
-                weights = np.array(weights) / sum(weights)
-                lane = np.random.choice(available_lanes, p=weights)
+                # Weighted pick: locate the roll within the cumulative weights
+                cumulative = np.cumsum(weights)
+                lane = int(np.searchsorted(cumulative, lane_rolls[i, k] * cumulative[-1], side='right'))
                 chosen_lanes.append(lane)
-                available_lanes.remove(lane)
+                available[lane] = False
 
-            # Create notes (convert numpy types to Python native types)
+            # Create notes
             for lane in chosen_lanes:
-                notes.append(Note(time=float(time), lane=int(lane), duration=0.0))
+                note_times[count] = time
+                note_lanes[count] = lane
+                count += 1
 
             # Update recent lanes
             recent_lanes.extend(chosen_lanes)
             if len(recent_lanes) > 4:
                 recent_lanes = recent_lanes[-4:]
 
-        return notes
+        return NoteArray(note_times[:count], note_lanes[:count], np.zeros(count))
 
-    def _add_hold_notes(self, notes: List[Note],
-                        analysis: AudioAnalysisResult) -> List[Note]:
+    def _add_hold_notes(self, notes: NoteArray,
+                        analysis: AudioAnalysisResult) -> NoteArray:
         """Convert some tap notes to hold notes based on difficulty."""
         hold_prob = self.params['hold_probability']
         if hold_prob == 0:
             return notes
 
         # Sort notes by time
-        notes = sorted(notes, key=lambda n: (n.time, n.lane))
-
-        for i, note in enumerate(notes):
-            if np.random.random() < hold_prob:
-                # Find next note in same lane or use beat interval
-                min_duration = 0.2
-                max_duration = 2.0
-
-                # Look for next note in same lane
-                next_time = None
-                for j in range(i + 1, len(notes)):
-                    if notes[j].lane == note.lane:
-                        next_time = notes[j].time
-                        break
-
-                if next_time and next_time - note.time > min_duration:
-                    # Make hold note end before next note
-                    note.duration = min((next_time - note.time) * 0.8, max_duration)
-                else:
-                    # Use beat-based duration
-                    beat_duration = 60.0 / analysis.tempo
-                    note.duration = min(beat_duration * np.random.randint(1, 4), max_duration)
+        notes = notes.sorted()
+        times, lanes = notes.times, notes.lanes
+        count = len(notes)
+
+        min_duration = 0.2
+        max_duration = 2.0
+        beat_duration = 60.0 / analysis.tempo
+
+        # Time of the next note in the same lane (NaN if none): a stable sort by
+        # lane keeps time order within each lane, so neighbors share a lane
+        next_time = np.full(count, np.nan)
+        by_lane = np.argsort(lanes, kind='stable')
+        same_lane = lanes[by_lane[1:]] == lanes[by_lane[:-1]]
+        next_time[by_lane[:-1][same_lane]] = times[by_lane[1:][same_lane]]
+        gap = next_time - times
+
+        is_hold = self._rng.random(count) < hold_prob
+        beat_multiples = self._rng.integers(1, 4, size=count)
+
+        # Make hold notes end before the next note in the lane, or use a beat-based duration
+        hold_durations = np.where(
+            gap > min_duration,
+            np.minimum(gap * 0.8, max_duration),
+            np.minimum(beat_duration * beat_multiples, max_duration)
+        )
+        notes.durations = np.where(is_hold, hold_durations, notes.durations)
 
         return notes
 
-    def _calculate_difficulty_value(self, notes: List[Note], duration: float) -> int:
+    def _calculate_difficulty_value(self, notes: NoteArray | List[Note], duration: float) -> int:
         """Calculate a 1-10 difficulty rating based on note density and patterns."""
         if duration == 0 or len(notes) == 0:
             return 1
 
+        if not isinstance(notes, NoteArray):
+            notes = NoteArray.from_notes(notes)
+
         # Notes per second
         nps = len(notes) / duration
 
@@ -318,12 +568,12 @@ class NoteGenerator:
         base_diff = min(max(int(nps * 1.5), 1), 10)
 
         # Adjust for hold notes
-        hold_count = sum(1 for n in notes if n.duration > 0)
+        hold_count = int((notes.durations > 0).sum())
         hold_factor = 1 + (hold_count / len(notes)) * 0.5
 
         # Adjust for simultaneous notes
-        times = [n.time for n in notes]
-        unique_times = len(set(round(t, 3) for t in times))
+        # (times compared at millisecond resolution, as integers)
+        unique_times = np.unique(np.round(notes.times * 1000).astype(np.int64)).size
         simultaneous_factor = 1 + (len(notes) - unique_times) / len(notes) * 0.5
 
         final_diff = int(base_diff * hold_factor * simultaneous_factor)
@@ -346,8 +596,8 @@ class NoteGenerator:
         new_notes = self._add_hold_notes(new_notes, analysis)
 
         # Combine and sort
-        all_notes = kept_notes + new_notes
-        all_notes.sort(key=lambda n: (n.time, n.lane))
+        all_notes = kept_notes + new_notes.to_notes()
+        all_notes.sort(key=NOTE_SORT_KEY)
 
         return all_notes
 
@@ -357,7 +607,6 @@ class NoteGenerator:
         if len(onsets) == 0:
             return onsets
 
-        min_interval = self.params['min_interval']
         beat_weight = self.params.get('beat_weight', 0.5)
         beat_times = analysis.beat_times
 
@@ -369,21 +618,26 @@ class NoteGenerator:
 
         # Merge with beats for better rhythm
         beat_tolerance = 60.0 / analysis.tempo * 0.25
-        merged = list(range_beats)
-
-        for ot in onsets:
-            is_near_beat = any(abs(ot - bt) < beat_tolerance for bt in range_beats)
-            if not is_near_beat and np.random.random() > beat_weight:
-                merged.append(ot)
+        off_beat = onsets[self._off_beat_mask(onsets, range_beats, beat_tolerance)]
+        off_beat = off_beat[self._rng.random(len(off_beat)) > beat_weight]
 
-        merged = sorted(set(merged))
+        merged = np.unique(np.concatenate((range_beats, off_beat)))
 
         # Filter by minimum interval
-        if len(merged) > 0:
-            filtered = [merged[0]]
-            for t in merged[1:]:
-                if t - filtered[-1] >= min_interval:
-                    filtered.append(t)
-            return np.array(filtered)
-
-        return np.array(merged)
+        return self._space_notes(merged, analysis)
+
+    def _off_beat_mask(self, onsets: np.ndarray, beat_times: np.ndarray,
+                       tolerance: float) -> np.ndarray:
+        """Return a mask of onsets that are at least `tolerance` away from every beat.
+
+        Uses binary search on the sorted beat times, so each onset is only
+        compared against its two neighboring beats.
+        """
+        if len(beat_times) == 0:
+            return np.ones(len(onsets), dtype=bool)
+
+        idx = np.searchsorted(beat_times, onsets)
+        left = beat_times[np.clip(idx - 1, 0, len(beat_times) - 1)]
+        right = beat_times[np.clip(idx, 0, len(beat_times) - 1)]
+        dist = np.minimum(np.abs(onsets - left), np.abs(onsets - right))
+        return dist >= tolerance
@@ -0,0 +1,97 @@
+"""
+Pitch detection in a worker process.
+pyin is CPU-bound; running it in another process keeps it off the UI's GIL.
+"""
+
+import multiprocessing
+import queue
+import traceback
+from multiprocessing.pool import AsyncResult
+from typing import List, Optional, Tuple
+
+from .audio_analyzer import AudioAnalyzer, PitchNote
+
+# Progress queue of the current worker process (set by _init_worker)
+_progress_queue = None
+
+
+class PitchDetectionError(Exception):
+    """Pitch detection failed in the worker; the message includes the worker's traceback."""
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _report_progress(percent: int, message: str):
+    """Progress callback that forwards updates to the parent process."""
+    if _progress_queue is not None:
+        _progress_queue.put((percent, message))
+
+
+def _detect_pitches(file_path: str, settings: dict, method: str) -> List[PitchNote]:
+    """Worker process entry point: run AudioAnalyzer.detect_pitches with the given settings."""
+    try:
+        analyzer = AudioAnalyzer(**settings)
+        return analyzer.detect_pitches(file_path, method=method, progress_callback=_report_progress)
+    except Exception as e:
+        # The traceback does not survive pickling, so send it as text
+        raise PitchDetectionError(f"{e}\n{traceback.format_exc()}") from None
+
+
+class PitchDetectionProcess:
+    """Runs pitch detection in a reusable child process.
+
+    The process is started on first use (spawned, not forked, so it does not
+    inherit the parent's GUI and audio threads) and kept for later detections.
+    Progress updates are queued by the child and collected with progress_updates().
+    Only one detection runs at a time; a failed one raises PitchDetectionError
+    from the result's get().
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._progress_queue = None
+        self._pending: Optional[AsyncResult] = None
+
+    def submit(self, analyzer: AudioAnalyzer, file_path: str, method: str = "pyin") -> AsyncResult:
+        """Start detecting pitches with the analyzer's settings; returns the pending result.
+
+        A detection still running is cancelled first (its process is stopped,
+        so it neither delays this one nor mixes its progress into the queue).
+        """
+        if self._pending is not None and not self._pending.ready():
+            self.shutdown()
+        if self._pool is None:
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._pool = context.Pool(processes=1, initializer=_init_worker,
+                                      initargs=(self._progress_queue,))
+        settings = {
+            'hop_length': analyzer.hop_length,
+            'n_fft': analyzer.n_fft,
+            'use_disk_cache': analyzer.use_disk_cache,
+        }
+        self._pending = self._pool.apply_async(_detect_pitches, (str(file_path), settings, method))
+        return self._pending
+
+    def progress_updates(self) -> List[Tuple[int, str]]:
+        """Take the (percent, message) updates received since the last call."""
+        updates = []
+        if self._progress_queue is None:
+            return updates
+        while True:
+            try:
+                updates.append(self._progress_queue.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def shutdown(self):
+        """Stop the worker process, abandoning any detection still running."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._progress_queue = None
+        self._pending = None
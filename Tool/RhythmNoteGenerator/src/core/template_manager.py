@@ -3,13 +3,106 @@ Template management system for note chart export.
 Templates define output format with constraints on structure.
 """
 
+import functools
+import itertools
 import json
+import os
+import re
+import numpy as np
 import yaml
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
-from string import Template
-from .note_generator import NoteChart, Note, Difficulty
+from typing import Dict, Iterable, Iterator, List, Any, Optional, TextIO, Tuple
+from string import Formatter, Template
+from .note_generator import NoteChart, Note, Difficulty, _round_to_list
+
+# orjson is optional; it is several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prefer the libyaml-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YAMLLoader, CSafeDumper as _YAMLDumper
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader, SafeDumper as _YAMLDumper
+
+DEFAULT_TEMPLATES_DIR = Path(__file__).parent.parent.parent / 'templates'
+
+# A text-format note line made of plain numbers and one separator: time, lane[, duration]
+_NOTE_LINE_RE = re.compile(r'(\d+(?:\.\d+)?)([|:,\t ])(\d+)(?:\2(\d+(?:\.\d+)?))?')
+
+# Difficulty lookup for imported charts (unknown names fall back to NORMAL)
+DIFFICULTY_BY_NAME = {d.name: d for d in Difficulty}
+
+# Variables available to header/footer templates (see TemplateManager._get_chart_vars)
+CHART_VARS = frozenset(('title', 'artist', 'audio_file', 'bpm', 'offset', 'duration',
+                        'num_keys', 'difficulty', 'difficulty_value'))
+
+# Variables available to note_table_template (see TemplateManager._get_note_columns)
+NOTE_VARS = frozenset(('time', 'time_ms', 'lane', 'duration', 'duration_ms'))
+
+# Notes rendered per string yielded by TemplateManager.iter_export
+EXPORT_CHUNK_NOTES = 4096
+
+# Parsed user templates are cached as JSON in templates/.cache; bump when the cached layout changes
+TEMPLATE_CACHE_VERSION = 1
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _join_chunks(lines: Iterable[str], sep: str) -> Iterator[str]:
+    """Yield sep.join(lines) in pieces of up to EXPORT_CHUNK_NOTES lines."""
+    lines = iter(lines)
+    chunk = list(itertools.islice(lines, EXPORT_CHUNK_NOTES))
+    yield sep.join(chunk)
+    while True:
+        chunk = list(itertools.islice(lines, EXPORT_CHUNK_NOTES))
+        if not chunk:
+            return
+        yield sep
+        yield sep.join(chunk)
+
+
+@functools.lru_cache(maxsize=64)
+def _to_format_string(text: str, names: frozenset) -> str:
+    """Translate a string.Template into an equivalent str.format_map string.
+
+    Placeholders not in names are kept literally, matching safe_substitute.
+    """
+    parts = []
+    pos = 0
+    for match in Template.pattern.finditer(text):
+        parts.append(_escape_braces(text[pos:match.start()]))
+        name = match.group('named') or match.group('braced')
+        if match.group('escaped') is not None:
+            parts.append('$')
+        elif name in names:
+            parts.append('{' + name + '}')
+        else:
+            parts.append(_escape_braces(match.group(0)))
+        pos = match.end()
+    parts.append(_escape_braces(text[pos:]))
+    return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=64)
+def _to_positional_format(fmt: str) -> Tuple[str, Tuple[str, ...]]:
+    """Rewrite named fields of a format string as positional ones.
+
+    Returns the new format string and the field names in argument order.
+    """
+    parts = []
+    names = []
+    for literal, name, _, _ in Formatter().parse(fmt):
+        parts.append(_escape_braces(literal))
+        if name is not None:
+            parts.append('{%d}' % len(names))
+            names.append(name)
+    return ''.join(parts), tuple(names)
 
 
 @dataclass
@@ -55,6 +148,16 @@ class TemplateSchema:
             ]
         )
 
+    @functools.cached_property
+    def required_fields(self) -> Dict[str, Tuple[str, ...]]:
+        """Names of required fields per section (the schema is fixed once built)."""
+        return {
+            'metadata': tuple(f.name for f in self.metadata_fields if f.required),
+            'timing': tuple(f.name for f in self.timing_fields if f.required),
+            'chart': tuple(f.name for f in self.chart_fields if f.required),
+            'note': tuple(f.name for f in self.note_fields if f.required),
+        }
+
 
 @dataclass
 class ChartTemplate:
@@ -83,11 +186,12 @@ class TemplateManager:
     """Manages chart templates and export functionality."""
 
     def __init__(self, templates_dir: Optional[Path] = None):
-        self.templates_dir = templates_dir or Path(__file__).parent.parent.parent / 'templates'
+        self.templates_dir = templates_dir or DEFAULT_TEMPLATES_DIR
         self.schema = TemplateSchema.default()
         self.templates: Dict[str, ChartTemplate] = {}
         self._load_builtin_templates()
-        self._load_user_templates()
+        # User templates are parsed on first need (see _ensure_user_templates)
+        self._user_loaded = False
 
     def _load_builtin_templates(self):
         """Load built-in templates."""
@@ -154,47 +258,115 @@ class TemplateManager:
             separator='\n'
         )
 
+    def _ensure_user_templates(self):
+        """Load user templates from disk if that has not happened yet."""
+        if not self._user_loaded:
+            self._user_loaded = True
+            self._load_user_templates()
+
     def _load_user_templates(self):
         """Load user-defined templates from templates directory."""
         if not self.templates_dir.exists():
             return
 
-        for template_file in self.templates_dir.glob('*.template.yaml'):
+        # A plain suffix check on scandir entries avoids pathlib's pattern matching
+        with os.scandir(self.templates_dir) as entries:
+            template_files = [Path(e.path) for e in entries
+                              if e.name.endswith('.template.yaml') and e.is_file()]
+
+        for template_file in template_files:
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-
-                name = data.get('name', template_file.stem.replace('.template', ''))
-                template = ChartTemplate(
-                    name=name,
-                    description=data.get('description', ''),
-                    file_extension=data.get('file_extension', '.txt'),
-                    format_type=data.get('format_type', 'text'),
-                    structure=data.get('structure', {}),
-                    note_table_format=data.get('note_table_format', 'list'),
-                    note_table_template=data.get('note_table_template', ''),
-                    separator=data.get('separator', '\n'),
-                    header_template=data.get('header_template', ''),
-                    footer_template=data.get('footer_template', '')
-                )
-
-                # Validate against schema
-                if self._validate_template(template):
-                    self.templates[name.lower()] = template
+                template = self._load_template_file(template_file)
+                self.templates[template.name.lower()] = template
             except Exception as e:
                 print(f"Warning: Failed to load template {template_file}: {e}")
 
-    def _validate_template(self, template: ChartTemplate) -> bool:
-        """Validate that a template includes all required fields."""
-        # For now, accept all templates but ensure they can render required fields
-        return True
+    def _load_template_file(self, template_file: Path) -> ChartTemplate:
+        """Parse a template file, reusing its cached fields while the file is unchanged."""
+        mtime = template_file.stat().st_mtime_ns
+        cache_file = self._template_cache_file(template_file)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if (isinstance(cached, dict) and cached.get('mtime') == mtime
+                    and isinstance(cached.get('template'), dict)):
+                return self._template_from_data(cached['template'], template_file)
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache - parse the YAML instead
+
+        with open(template_file, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=_YAMLLoader)
+
+        template = self._template_from_data(data, template_file)
+        self._write_template_cache(template_file, mtime, template)
+        return template
+
+    @staticmethod
+    def _template_from_data(data: dict, template_file: Path) -> ChartTemplate:
+        """Build a template from its file's fields (missing ones get defaults)."""
+        return ChartTemplate(
+            name=data.get('name', template_file.stem.replace('.template', '')),
+            description=data.get('description', ''),
+            file_extension=data.get('file_extension', '.txt'),
+            format_type=data.get('format_type', 'text'),
+            structure=data.get('structure', {}),
+            note_table_format=data.get('note_table_format', 'list'),
+            note_table_template=data.get('note_table_template', ''),
+            separator=data.get('separator', '\n'),
+            header_template=data.get('header_template', ''),
+            footer_template=data.get('footer_template', '')
+        )
+
+    @staticmethod
+    def _template_to_data(template: ChartTemplate) -> dict:
+        """The fields written to a template file."""
+        return {
+            'name': template.name,
+            'description': template.description,
+            'file_extension': template.file_extension,
+            'format_type': template.format_type,
+            'structure': template.structure,
+            'note_table_format': template.note_table_format,
+            'note_table_template': template.note_table_template,
+            'separator': template.separator,
+            'header_template': template.header_template,
+            'footer_template': template.footer_template,
+        }
+
+    def _template_cache_file(self, template_file: Path) -> Path:
+        """Path of the JSON cache for a template file."""
+        return self.templates_dir / '.cache' / f"{template_file.name}.v{TEMPLATE_CACHE_VERSION}.json"
+
+    def _write_template_cache(self, template_file: Path, mtime: int, template: ChartTemplate):
+        """Write a template's JSON cache atomically; a read-only templates dir just skips caching."""
+        data = self._template_to_data(template)
+        try:
+            text = json.dumps({'mtime': mtime, 'template': data}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return  # YAML values JSON cannot hold (e.g. dates)
+        if json.loads(text)['template'] != data:
+            return  # Not lossless in JSON (e.g. non-string keys in structure)
+
+        cache_file = self._template_cache_file(template_file)
+        tmp_file = cache_file.with_suffix('.tmp')
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
 
     def get_template(self, name: str) -> Optional[ChartTemplate]:
         """Get a template by name."""
-        return self.templates.get(name.lower())
+        key = name.lower()
+        if key not in self.templates:
+            self._ensure_user_templates()
+        return self.templates.get(key)
 
     def list_templates(self) -> List[Dict[str, str]]:
         """List all available templates."""
+        self._ensure_user_templates()
         return [
             {
                 'name': t.name,
@@ -206,21 +378,60 @@ class TemplateManager:
 
     def export(self, chart: NoteChart, template_name: str) -> str:
         """Export a chart using the specified template."""
+        return ''.join(self.iter_export(chart, template_name))
+
+    def export_to(self, chart: NoteChart, template_name: str, fp: TextIO):
+        """Export a chart to an open text stream, one chunk at a time."""
+        fp.writelines(self.iter_export(chart, template_name))
+
+    def export_file(self, chart: NoteChart, template_name: str, file_path: str | Path):
+        """Export a chart to a file without holding the whole output in memory.
+
+        The output is streamed to a temporary file that then replaces file_path,
+        so a failed export never leaves a truncated chart behind.
+        """
+        chunks = self.iter_export(chart, template_name)
+        file_path = Path(file_path)
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+                f.writelines(chunks)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def iter_export(self, chart: NoteChart, template_name: str) -> Iterator[str]:
+        """Export a chart as an iterator of text chunks that concatenate to export().
+
+        The template is looked up immediately, so a bad name raises here rather
+        than on the first chunk.
+        """
         template = self.get_template(template_name)
         if not template:
             raise ValueError(f"Template '{template_name}' not found")
 
         if template.format_type == 'json':
-            return self._export_json(chart, template)
+            return self._iter_json(chart, template)
         elif template.format_type == 'yaml':
-            return self._export_yaml(chart, template)
-        elif template.format_type == 'csv':
-            return self._export_csv(chart, template)
-        elif template.format_type == 'text':
-            return self._export_text(chart, template)
+            return self._iter_yaml(chart, template)
+        elif template.format_type in ('csv', 'text'):
+            # Header/footer depend only on chart metadata, so render them once here
+            chart_vars = self._get_chart_vars(chart)
+            header = self._render_chart_template(template.header_template, chart_vars)
+            if template.format_type == 'csv':
+                return self._iter_csv(chart, template, header)
+            footer = self._render_chart_template(template.footer_template, chart_vars)
+            return self._iter_text(chart, template, header, footer)
         else:
             raise ValueError(f"Unknown format type: {template.format_type}")
 
+    def _render_chart_template(self, text: str, chart_vars: Dict[str, Any]) -> Optional[str]:
+        """Substitute chart variables into a header/footer template (None if unset)."""
+        if not text:
+            return None
+        return _to_format_string(text, CHART_VARS).format_map(chart_vars)
+
     def _get_chart_vars(self, chart: NoteChart) -> Dict[str, Any]:
         """Get all chart variables for template substitution."""
         return {
@@ -235,75 +446,98 @@ class TemplateManager:
             'difficulty_value': chart.difficulty_value,
         }
 
-    def _get_note_vars(self, note: Note) -> Dict[str, Any]:
-        """Get note variables for template substitution."""
+    def _get_note_columns(self, chart: NoteChart) -> Dict[str, list]:
+        """Get note variables for template substitution, one list per variable."""
+        arrays = chart.note_arrays()
         return {
-            'time': round(note.time, 4),
-            'time_ms': int(note.time * 1000),
-            'lane': note.lane,
-            'duration': round(note.duration, 4),
-            'duration_ms': int(note.duration * 1000),
+            'time': _round_to_list(arrays.times, 4),
+            'time_ms': (arrays.times * 1000).astype(np.int64).tolist(),
+            'lane': arrays.lanes.tolist(),
+            'duration': _round_to_list(arrays.durations, 4),
+            'duration_ms': (arrays.durations * 1000).astype(np.int64).tolist(),
         }
 
-    def _export_json(self, chart: NoteChart, template: ChartTemplate) -> str:
-        """Export as JSON."""
+    def _iter_json(self, chart: NoteChart, template: ChartTemplate) -> Iterator[str]:
+        """Export as JSON (one chunk: orjson serializes in a single C call)."""
         data = chart.to_dict()
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            yield orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        else:
+            yield json.dumps(data, indent=2, ensure_ascii=False)
 
-    def _export_yaml(self, chart: NoteChart, template: ChartTemplate) -> str:
+    def _iter_yaml(self, chart: NoteChart, template: ChartTemplate) -> Iterator[str]:
         """Export as YAML."""
         data = chart.to_dict()
-        return yaml.dump(data, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        arrays = chart.note_arrays()
+
+        # The notes list is emitted directly in PyYAML's block style: for finite
+        # floats below 1e16 its float text is plain repr(). Anything else goes
+        # through the full dumper.
+        if not len(arrays) or not (np.all(np.abs(arrays.times) < 1e16)
+                                   and np.all(np.abs(arrays.durations) < 1e16)):
+            yield yaml.dump(data, Dumper=_YAMLDumper, default_flow_style=False,
+                            allow_unicode=True, sort_keys=False)
+            return
 
-    def _export_csv(self, chart: NoteChart, template: ChartTemplate) -> str:
-        """Export as CSV."""
-        lines = []
+        notes = data.pop('notes')
+        yield yaml.dump(data, Dumper=_YAMLDumper, default_flow_style=False,
+                        allow_unicode=True, sort_keys=False)
+        yield 'notes:\n'
+        note_fmt = '- time: {time!r}\n  lane: {lane}\n  duration: {duration!r}\n'
+        yield from _join_chunks(map(note_fmt.format_map, notes), '')
 
+    def _iter_csv(self, chart: NoteChart, template: ChartTemplate,
+                  header: Optional[str] = None) -> Iterator[str]:
+        """Export as CSV, below an optional rendered header."""
         # Header comments
-        if template.header_template:
-            header = Template(template.header_template).safe_substitute(self._get_chart_vars(chart))
-            lines.append(header)
+        if header is not None:
+            yield header
+            yield '\n'
 
         # CSV header
-        lines.append('time,lane,duration')
+        yield 'time,lane,duration'
 
         # Notes
-        for note in chart.notes:
-            lines.append(f'{note.time:.4f},{note.lane},{note.duration:.4f}')
-
-        return '\n'.join(lines)
-
-    def _export_text(self, chart: NoteChart, template: ChartTemplate) -> str:
-        """Export as custom text format."""
-        lines = []
-        chart_vars = self._get_chart_vars(chart)
+        if chart.notes:
+            arrays = chart.note_arrays()
+            rows = zip(arrays.times.tolist(), arrays.lanes.tolist(), arrays.durations.tolist())
+            yield '\n'
+            yield from _join_chunks(map('%.4f,%d,%.4f'.__mod__, rows), '\n')
+
+    def _iter_text(self, chart: NoteChart, template: ChartTemplate,
+                   header: Optional[str] = None, footer: Optional[str] = None) -> Iterator[str]:
+        """Export as custom text format, between an optional rendered header and footer."""
+        # Sections (header, notes, footer) are separated by newlines
+        need_newline = False
 
         # Header
-        if template.header_template:
-            header = Template(template.header_template).safe_substitute(chart_vars)
-            lines.append(header)
-
-        # Notes
-        note_lines = []
-        for note in chart.notes:
-            note_vars = self._get_note_vars(note)
-            if template.note_table_template:
-                line = Template(template.note_table_template).safe_substitute(note_vars)
-            else:
-                line = f"{note_vars['time']},{note_vars['lane']},{note_vars['duration']}"
-            note_lines.append(line)
+        if header is not None:
+            yield header
+            need_newline = True
 
-        if template.separator == '\n':
-            lines.extend(note_lines)
+        # Notes (template translated once, variables computed column-wise)
+        if template.note_table_template:
+            note_fmt = _to_format_string(template.note_table_template, NOTE_VARS)
         else:
-            lines.append(template.separator.join(note_lines))
+            note_fmt = '{time},{lane},{duration}'
+        note_fmt, names = _to_positional_format(note_fmt)
+        if names:
+            columns = self._get_note_columns(chart)
+            note_lines = map(note_fmt.format, *(columns[name] for name in names))
+        else:
+            note_lines = [note_fmt.format()] * len(chart.notes)
+        # A newline-separated block adds no line at all when there are no notes
+        if chart.notes or template.separator != '\n':
+            if need_newline:
+                yield '\n'
+            yield from _join_chunks(note_lines, template.separator)
+            need_newline = True
 
         # Footer
-        if template.footer_template:
-            footer = Template(template.footer_template).safe_substitute(chart_vars)
-            lines.append(footer)
-
-        return '\n'.join(lines)
+        if footer is not None:
+            if need_newline:
+                yield '\n'
+            yield footer
 
     def save_template(self, template: ChartTemplate) -> Path:
         """Save a custom template to the templates directory."""
@@ -312,21 +546,22 @@ class TemplateManager:
         filename = f"{template.name.lower().replace(' ', '_')}.template.yaml"
         filepath = self.templates_dir / filename
 
-        data = {
-            'name': template.name,
-            'description': template.description,
-            'file_extension': template.file_extension,
-            'format_type': template.format_type,
-            'structure': template.structure,
-            'note_table_format': template.note_table_format,
-            'note_table_template': template.note_table_template,
-            'separator': template.separator,
-            'header_template': template.header_template,
-            'footer_template': template.footer_template,
-        }
+        data = self._template_to_data(template)
+
+        # Write to a temporary file and swap it in, so a failed write never
+        # leaves a truncated template behind
+        tmp_path = filepath.with_suffix('.yaml.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                yaml.dump(data, f, Dumper=_YAMLDumper, default_flow_style=False,
+                          allow_unicode=True, sort_keys=False)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Prime the parsed-template cache so the next load skips YAML
+        self._write_template_cache(filepath, filepath.stat().st_mtime_ns, template)
 
         self.templates[template.name.lower()] = template
         return filepath
@@ -337,45 +572,61 @@ class TemplateManager:
 
     def get_required_fields(self) -> Dict[str, List[str]]:
         """Get list of required fields that cannot be removed."""
-        return {
-            'metadata': [f.name for f in self.schema.metadata_fields if f.required],
-            'timing': [f.name for f in self.schema.timing_fields if f.required],
-            'chart': [f.name for f in self.schema.chart_fields if f.required],
-            'note': [f.name for f in self.schema.note_fields if f.required],
-        }
+        return {section: list(names) for section, names in self.schema.required_fields.items()}
 
     def import_chart(self, file_path: str | Path) -> NoteChart:
         """Import a chart from file. Auto-detects format based on extension."""
         file_path = Path(file_path)
         ext = file_path.suffix.lower()
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
+        # JSON is parsed straight from the UTF-8 bytes and YAML from the open
+        # stream, so neither holds a decoded copy of the whole file
         if ext == '.json':
-            return self._import_json(content)
-        elif ext in ('.yaml', '.yml'):
-            return self._import_yaml(content)
-        elif ext == '.csv':
-            return self._import_csv(content)
-        else:
-            # Try to auto-detect format
-            content_stripped = content.strip()
-            if content_stripped.startswith('{'):
-                return self._import_json(content)
-            elif content_stripped.startswith('metadata:') or content_stripped.startswith('timing:'):
-                return self._import_yaml(content)
-            else:
-                return self._import_text(content)
+            with open(file_path, 'rb') as f:
+                return self._import_json(f.read())
 
-    def _import_json(self, content: str) -> NoteChart:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if ext in ('.yaml', '.yml'):
+                return self._import_yaml(f)
+            elif ext == '.csv':
+                return self._import_csv(f.read())
+
+            # Try to auto-detect format from the first non-whitespace text
+            head = self._peek_stripped(f)
+            if head.startswith('{'):
+                return self._import_json(f.read())
+            elif head.startswith('metadata:') or head.startswith('timing:'):
+                return self._import_yaml(f)
+            else:
+                return self._import_text(f.read())
+
+    @staticmethod
+    def _peek_stripped(f, min_length: int = 16) -> str:
+        """Read the start of a text stream without leading whitespace, then rewind it."""
+        head = ''
+        while len(head) < min_length:
+            chunk = f.read(min_length)
+            if not chunk:
+                break
+            head = (head + chunk).lstrip()
+        f.seek(0)
+        return head
+
+    def _import_json(self, content: str | bytes) -> NoteChart:
         """Import from JSON format."""
-        data = json.loads(content)
+        data = None
+        if orjson is not None:
+            try:
+                data = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass  # Let the stdlib parser handle (or report) non-strict JSON such as NaN
+        if data is None:
+            data = json.loads(content)
         return self._data_to_chart(data)
 
-    def _import_yaml(self, content: str) -> NoteChart:
-        """Import from YAML format."""
-        data = yaml.safe_load(content)
+    def _import_yaml(self, content: str | TextIO) -> NoteChart:
+        """Import from YAML format (a string or an open text stream)."""
+        data = yaml.load(content, Loader=_YAMLLoader)
         return self._data_to_chart(data)
 
     def _import_csv(self, content: str) -> NoteChart:
@@ -397,21 +648,11 @@ class TemplateManager:
                 note_lines.append(line)
 
         # Parse notes
-        notes = []
-        for line in note_lines:
-            parts = line.split(',')
-            if len(parts) >= 2:
-                time = float(parts[0])
-                lane = int(parts[1])
-                duration = float(parts[2]) if len(parts) > 2 else 0.0
-                notes.append(Note(time=time, lane=lane, duration=duration))
+        notes = self._parse_csv_notes(note_lines)
 
         # Determine difficulty from string
         diff_str = metadata.get('difficulty', 'NORMAL').upper()
-        try:
-            difficulty = Difficulty[diff_str]
-        except KeyError:
-            difficulty = Difficulty.NORMAL
+        difficulty = DIFFICULTY_BY_NAME.get(diff_str, Difficulty.NORMAL)
 
         return NoteChart(
             title=metadata.get('title', ''),
@@ -426,6 +667,32 @@ class TemplateManager:
             notes=notes
         )
 
+    def _parse_csv_notes(self, note_lines: List[str]) -> List[Note]:
+        """Parse 'time,lane[,duration]' lines into notes."""
+        # Uniform 2- or 3-column files are parsed in one np.loadtxt call
+        num_columns = note_lines[0].count(',') + 1 if note_lines else 0
+        if num_columns in (2, 3):
+            dtype = [('time', 'f8'), ('lane', 'i8'), ('duration', 'f8')][:num_columns]
+            try:
+                rows = np.loadtxt(note_lines, delimiter=',', dtype=dtype, comments=None, ndmin=1)
+            except ValueError:
+                rows = None  # Ragged or unusual rows - use the line-by-line parser
+            if rows is not None:
+                times = rows['time'].tolist()
+                lanes = rows['lane'].tolist()
+                durations = rows['duration'].tolist() if num_columns == 3 else [0.0] * len(times)
+                return list(map(Note, times, lanes, durations))
+
+        notes = []
+        for line in note_lines:
+            parts = line.split(',')
+            if len(parts) >= 2:
+                time = float(parts[0])
+                lane = int(parts[1])
+                duration = float(parts[2]) if len(parts) > 2 else 0.0
+                notes.append(Note(time=time, lane=lane, duration=duration))
+        return notes
+
     def _import_text(self, content: str) -> NoteChart:
         """Import from text format (simple or custom)."""
         lines = content.strip().split('\n')
@@ -441,6 +708,14 @@ class TemplateManager:
             if not line:
                 continue
 
+            # Inside [Notes] every line except a section header is a note line,
+            # so the bulk of the file skips the header/metadata checks below
+            if in_notes_section and line[0] != '[':
+                note = self._parse_text_note(line)
+                if note is not None:
+                    notes.append(note)
+                continue
+
             # Check for section headers
             if line.startswith('[') and line.endswith(']'):
                 section = line[1:-1].lower()
@@ -459,34 +734,13 @@ class TemplateManager:
 
             # Parse note lines
             if in_notes_section or line[0].isdigit():
-                # Try different separators: |, :, ,, whitespace
-                for sep in ['|', ':', ',', '\t', ' ']:
-                    if sep in line:
-                        parts = [p.strip() for p in line.split(sep) if p.strip()]
-                        if len(parts) >= 2:
-                            try:
-                                # Check if first part is time in ms or seconds
-                                time_val = float(parts[0])
-                                if time_val > 1000:  # Likely milliseconds
-                                    time_val /= 1000.0
-                                lane = int(parts[1])
-                                duration = 0.0
-                                if len(parts) > 2:
-                                    dur_val = float(parts[2])
-                                    if dur_val > 100:  # Likely milliseconds
-                                        dur_val /= 1000.0
-                                    duration = dur_val
-                                notes.append(Note(time=time_val, lane=lane, duration=duration))
-                                break
-                            except (ValueError, IndexError):
-                                continue
+                note = self._parse_text_note(line)
+                if note is not None:
+                    notes.append(note)
 
         # Determine difficulty
         diff_str = metadata.get('difficulty', 'NORMAL').upper()
-        try:
-            difficulty = Difficulty[diff_str]
-        except KeyError:
-            difficulty = Difficulty.NORMAL
+        difficulty = DIFFICULTY_BY_NAME.get(diff_str, Difficulty.NORMAL)
 
         return NoteChart(
             title=metadata.get('title', ''),
@@ -501,6 +755,39 @@ class TemplateManager:
             notes=notes
         )
 
+    def _parse_text_note(self, line: str) -> Optional[Note]:
+        """Parse a text note line, or return None if it is not one."""
+        # Common case: plain numbers joined by a single separator
+        match = _NOTE_LINE_RE.fullmatch(line)
+        if match:
+            return self._text_note(*match.group(1, 3, 4))
+
+        # Try different separators: |, :, ,, whitespace
+        for sep in ['|', ':', ',', '\t', ' ']:
+            if sep in line:
+                parts = [p.strip() for p in line.split(sep) if p.strip()]
+                if len(parts) >= 2:
+                    try:
+                        duration_str = parts[2] if len(parts) > 2 else None
+                        return self._text_note(parts[0], parts[1], duration_str)
+                    except (ValueError, IndexError):
+                        continue
+        return None
+
+    def _text_note(self, time_str: str, lane_str: str, duration_str: Optional[str]) -> Note:
+        """Build a note from text fields, converting millisecond values to seconds."""
+        # Check if first part is time in ms or seconds
+        time_val = float(time_str)
+        if time_val > 1000:  # Likely milliseconds
+            time_val /= 1000.0
+        lane = int(lane_str)
+        duration = 0.0
+        if duration_str is not None:
+            duration = float(duration_str)
+            if duration > 100:  # Likely milliseconds
+                duration /= 1000.0
+        return Note(time=time_val, lane=lane, duration=duration)
+
     def _data_to_chart(self, data: Dict[str, Any]) -> NoteChart:
         """Convert dictionary data to NoteChart."""
         # Handle nested structure
@@ -512,10 +799,7 @@ class TemplateManager:
         # Determine difficulty
         diff_str = chart_info.get('difficulty', 'NORMAL')
         if isinstance(diff_str, str):
-            try:
-                difficulty = Difficulty[diff_str.upper()]
-            except KeyError:
-                difficulty = Difficulty.NORMAL
+            difficulty = DIFFICULTY_BY_NAME.get(diff_str.upper(), Difficulty.NORMAL)
         else:
             difficulty = Difficulty(int(diff_str))
 
@@ -540,3 +824,24 @@ class TemplateManager:
             difficulty_value=int(chart_info.get('difficulty_value', 1)),
             notes=notes
         )
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_template_manager(templates_dir: str) -> TemplateManager:
+    return TemplateManager(Path(templates_dir))
+
+
+def get_template_manager(templates_dir: Optional[Path] = None) -> TemplateManager:
+    """Get a shared TemplateManager for a templates directory.
+
+    Repeated calls reuse the instance and its loaded templates. save_template()
+    updates the shared instance; after editing template files by other means,
+    call clear_template_manager_cache().
+    """
+    templates_dir = Path(templates_dir) if templates_dir else DEFAULT_TEMPLATES_DIR
+    return _shared_template_manager(str(templates_dir.resolve()))
+
+
+def clear_template_manager_cache():
+    """Drop the shared TemplateManagers, so the next get_template_manager() reloads."""
+    _shared_template_manager.cache_clear()
@@ -3,12 +3,48 @@ Kalimba tab visualization widget.
 Displays detected pitches as kalimba tablature.
 """
 
+import bisect
 from typing import Optional, List, Dict
+import numpy as np
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox
-from PySide6.QtCore import Qt, Signal, QRectF
-from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QFont, QPainterPath
+from PySide6.QtCore import Qt, Signal, QLine, QRect, QRectF
+from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QFont, QPainterPath, QPixmap
 
 from ..core.audio_analyzer import PitchNote
+from ..core._jit import njit
+
+
+@njit(cache=True)
+def _note_draw_params(times, durations, tines, tine_xs, lo, hi, cull_start,
+                      view_start, time_range, tab_height, bottom, half_height):
+    """Cull the time-sorted playable notes in [lo, hi) and compute their draw coordinates.
+
+    Returns the kept note indices with their x, y, duration-end y and whether a
+    duration line is drawn (time flows bottom to top, so y is flipped).
+    """
+    n = max(hi - lo, 0)
+    idx = np.empty(n, dtype=np.int64)
+    xs = np.empty(n, dtype=np.float64)
+    ys = np.empty(n, dtype=np.float64)
+    end_ys = np.empty(n, dtype=np.float64)
+    has_line = np.empty(n, dtype=np.bool_)
+    k = 0
+    for i in range(lo, hi):
+        # Skip notes that end before the span
+        if times[i] + durations[i] < cull_start:
+            continue
+        x = tine_xs[tines[i]]
+        if np.isnan(x):
+            continue
+        y = bottom - ((times[i] - view_start) / time_range * tab_height)
+        end_y = bottom - ((times[i] + durations[i] - view_start) / time_range * tab_height)
+        idx[k] = i
+        xs[k] = x
+        ys[k] = y
+        end_ys[k] = end_y
+        has_line[k] = durations[i] > 0.1 and end_y < y - half_height
+        k += 1
+    return idx[:k], xs[:k], ys[:k], end_ys[:k], has_line[:k]
 
 
 class KalimbaWidget(QWidget):
@@ -46,23 +82,55 @@ class KalimbaWidget(QWidget):
     KALIMBA_RANGE_MIN = 60  # C4
     KALIMBA_RANGE_MAX = 88  # E6
 
+    # Height of the tine panel at the bottom of the widget
+    TINE_AREA_HEIGHT = 60
+
+    # Time grid interval by visible time range: up to each threshold use the
+    # matching interval, beyond the last one use the final interval
+    GRID_RANGE_THRESHOLDS = (2, 5, 15, 60)
+    GRID_INTERVALS = (0.25, 0.5, 1.0, 5.0, 10.0)
+
+    # MIDI -> tine info lookup tables, built lazily per transpose_octave
+    _MIDI_LUT_BY_TRANSPOSE: Dict[int, tuple] = {}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(250)
         self.setMinimumWidth(400)
+        # Every paint covers the whole widget, so skip Qt's background erase
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
 
         # Data
         self.pitch_notes: List[PitchNote] = []
         self.duration: float = 0.0
 
+        # Note fields as parallel arrays for vectorized culling in paint; times stay
+        # float64 so culling matches the float seconds, the rest is narrowed
+        self._note_times = np.empty(0, dtype=np.float64)
+        self._note_durations = np.empty(0, dtype=np.float64)
+        self._note_midi = np.empty(0, dtype=np.int16)
+        self._note_alphas = np.empty(0, dtype=np.int16)
+        self._note_color_idxs = np.empty(0, dtype=np.int8)
+        self._note_tines = np.empty(0, dtype=np.int8)
+        # The same fields restricted to notes with a tine at the current transpose
+        self._playable_times = self._note_times
+        self._playable_durations = self._note_durations
+        self._playable_end_max = self._note_times
+        self._playable_alphas = self._note_alphas
+        self._playable_color_idxs = self._note_color_idxs
+        self._playable_tines = self._note_tines
+
         # View state
         self.view_start: float = 0.0
         self.view_end: float = 10.0
         self.playback_position: float = 0.0
+        self._wheel_delta = 0  # Accumulated partial wheel notches
 
         # Display options
         self.show_note_names = True
         self.transpose_octave = 0  # Octave adjustment for out-of-range notes
+        self._active_lut = self._get_midi_lut(self.transpose_octave)
+        self._tine_display_names = dict(zip(self._SORTED_TINE_NUMS, self._SORTED_DISPLAY_NAMES))
 
         # Colors
         self.bg_color = QColor(30, 30, 35)
@@ -79,21 +147,71 @@ class KalimbaWidget(QWidget):
         ]
         self.playhead_color = QColor(255, 255, 255)
         self.grid_color = QColor(60, 60, 70)
+        # Brushes and pens per (note color index, alpha), filled on first use
+        self._note_styles: Dict[tuple, tuple] = {}
+
+        self.label_font = QFont("Arial", 7, QFont.Bold)
+        self.note_font = QFont("Arial", 9, QFont.Bold)
+
+        # Pens and brushes reused across paints
+        self._grid_pen = QPen(self.grid_color, 1)
+        self._lane_pen = QPen(self.grid_color, 1, Qt.DotLine)
+        self._note_text_pen = QPen(Qt.white)
+        self._tine_brush = QBrush(self.tine_color)
+        self._tine_pen = QPen(self.tine_highlight, 1)
+        self._tine_text_pen = QPen(QColor(60, 40, 20))
+        self._tine_area_color = QColor(40, 35, 30)
+        self._playhead_pen = QPen(self.playhead_color, 2)
+
+        # Cached rendering of the static tine panel, keyed by its size
+        self._tine_pixmap: Optional[QPixmap] = None
+        self._tine_pixmap_key = None
+        # Cached background + tine lanes, keyed by size
+        self._static_layer: Optional[QPixmap] = None
+        self._static_layer_key = None
+
+        # Set while a full repaint is queued; partial updates are redundant then
+        self._full_update_pending = False
 
     def set_pitch_notes(self, notes: List[PitchNote], duration: float):
         """Set the pitch notes to display."""
         self.pitch_notes = notes or []
         self.duration = duration
-        self.update()
+
+        notes = self.pitch_notes
+        count = len(notes)
+        self._note_times = np.fromiter((n.time for n in notes), dtype=np.float64, count=count)
+        self._note_durations = np.fromiter((n.duration for n in notes), dtype=np.float64, count=count)
+        midi = np.fromiter((n.midi_note for n in notes), dtype=np.int64, count=count)
+        confidence = np.fromiter((n.confidence for n in notes), dtype=np.float64, count=count)
+
+        # Keep the arrays time-sorted (stable, so ordered input is unchanged)
+        order = np.argsort(self._note_times, kind='stable')
+        self._note_times = self._note_times[order]
+        self._note_durations = self._note_durations[order]
+        midi = midi[order]
+        self._note_midi = midi.astype(np.int16)
+        # Alpha based on confidence, color based on note
+        self._note_alphas = (150 + confidence[order] * 105).astype(np.int16)
+        self._note_color_idxs = (midi % len(self.note_colors)).astype(np.int8)
+        self._update_note_tines()
+        self._schedule_update()
 
     def set_view_range(self, start: float, end: float):
         """Set the visible time range."""
-        self.view_start = max(0, start)
-        self.view_end = min(self.duration, end) if self.duration > 0 else end
-        self.update()
+        start = max(0, start)
+        end = min(self.duration, end) if self.duration > 0 else end
+        # Ranges equal up to float noise (e.g. from scrollbar round trips) need no repaint
+        if abs(start - self.view_start) < 1e-9 and abs(end - self.view_end) < 1e-9:
+            return
+        self.view_start = start
+        self.view_end = end
+        self._schedule_update()
 
     def set_playback_position(self, position: float, auto_scroll: bool = True):
         """Set current playback position with auto-scroll (notes scroll past fixed playhead)."""
+        old_position = self.playback_position
+        old_playhead_rect = self._playhead_rect()
         self.playback_position = position
         scrolled = False
 
@@ -124,7 +242,12 @@ class KalimbaWidget(QWidget):
                 self.view_end = view_range
                 scrolled = True
 
-        self.update()
+        if scrolled or old_playhead_rect is None:
+            self._schedule_update()
+        elif position != old_position:
+            # Only the playhead moved: repaint the strips under its old and new spot
+            self._schedule_update(old_playhead_rect)
+            self._schedule_update(self._playhead_rect())
 
         # Emit signal if view changed for scrollbar sync
         if scrolled:
@@ -133,59 +256,115 @@ class KalimbaWidget(QWidget):
     def set_transpose(self, octaves: int):
         """Set octave transposition for out-of-range notes."""
         self.transpose_octave = octaves
-        self.update()
+        self._active_lut = self._get_midi_lut(octaves)
+        self._update_note_tines()
+        self._schedule_update()
+
+    def _schedule_update(self, rect: Optional[QRect] = None):
+        """Request a repaint of rect (or the whole widget), coalescing requests.
+
+        Qt merges update() calls into one paint event per event-loop pass; this
+        additionally drops partial requests once a full repaint is queued.
+        Requests are skipped while the widget is hidden (e.g. its tab is not
+        active): Qt repaints the whole widget when it is shown again.
+        """
+        if not self.isVisible():
+            return
+        if rect is None:
+            self._full_update_pending = True
+            self.update()
+        elif not self._full_update_pending:
+            self.update(rect)
+
+    def _update_note_tines(self):
+        """Resolve the tine number of every note (0 = not playable)."""
+        midi = self._note_midi
+        in_range = (midi >= 0) & (midi < 128)
+        tine_nums = np.array([info[0] if info else 0 for info in self._active_lut], dtype=np.int8)
+        tines = np.zeros(len(midi), dtype=np.int8)
+        tines[in_range] = tine_nums[midi[in_range]]
+        # MIDI numbers outside the table are folded one by one
+        for i in np.nonzero(~in_range)[0]:
+            info = self._midi_to_tine(int(midi[i]))
+            tines[i] = info[0] if info else 0
+        self._note_tines = tines
+
+        # Paint only walks playable notes; the running max end time lets it
+        # binary-search the view window
+        playable = tines > 0
+        self._playable_times = self._note_times[playable]
+        self._playable_durations = self._note_durations[playable]
+        self._playable_end_max = np.maximum.accumulate(self._playable_times + self._playable_durations)
+        self._playable_alphas = self._note_alphas[playable]
+        self._playable_color_idxs = self._note_color_idxs[playable]
+        self._playable_tines = tines[playable]
+
+    @classmethod
+    def _get_midi_lut(cls, transpose_octave: int) -> tuple:
+        """Get the 128-entry MIDI -> tine info table for a transposition."""
+        lut = cls._MIDI_LUT_BY_TRANSPOSE.get(transpose_octave)
+        if lut is None:
+            lut = tuple(cls._fold_midi_to_tine(midi, transpose_octave) for midi in range(128))
+            cls._MIDI_LUT_BY_TRANSPOSE[transpose_octave] = lut
+        return lut
 
     def _midi_to_tine(self, midi_note: int) -> Optional[tuple]:
         """Convert MIDI note to kalimba tine info.
 
         Returns (tine_number, position, note_name) or None if not playable.
         """
+        if 0 <= midi_note < 128:
+            return self._active_lut[midi_note]
+        return self._fold_midi_to_tine(midi_note, self.transpose_octave)
+
+    @classmethod
+    def _fold_midi_to_tine(cls, midi_note: int, transpose_octave: int) -> Optional[tuple]:
+        """Fold a MIDI note into the kalimba range and look up its tine."""
         # Apply transposition to fit kalimba range
         adjusted = midi_note
-        while adjusted < self.KALIMBA_RANGE_MIN:
+        while adjusted < cls.KALIMBA_RANGE_MIN:
             adjusted += 12
-        while adjusted > self.KALIMBA_RANGE_MAX:
+        while adjusted > cls.KALIMBA_RANGE_MAX:
             adjusted -= 12
 
         # Additional manual transpose
-        adjusted += self.transpose_octave * 12
-        while adjusted < self.KALIMBA_RANGE_MIN:
+        adjusted += transpose_octave * 12
+        while adjusted < cls.KALIMBA_RANGE_MIN:
             adjusted += 12
-        while adjusted > self.KALIMBA_RANGE_MAX:
+        while adjusted > cls.KALIMBA_RANGE_MAX:
             adjusted -= 12
 
-        return self.KALIMBA_17_C.get(adjusted)
+        return cls.KALIMBA_17_C.get(adjusted)
 
     def paintEvent(self, event):
         """Paint the kalimba tablature (tines at bottom, time flows bottom to top)."""
+        self._full_update_pending = False
+        # Antialiasing is enabled only around the rounded note shapes
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
 
         width = self.width()
         height = self.height()
 
-        # Background
-        painter.fillRect(0, 0, width, height, self.bg_color)
-
         # Layout areas - tines at BOTTOM, tab area above
-        tine_area_height = 60  # Bottom area showing tines
+        tine_area_height = self.TINE_AREA_HEIGHT  # Bottom area showing tines
         tab_area_top = 0  # Tab area starts at top
         tab_area_height = height - tine_area_height
         tine_area_top = tab_area_height  # Tines start after tab area
         time_range = self.view_end - self.view_start
 
         if time_range <= 0:
+            # Background
+            painter.fillRect(0, 0, width, height, self.bg_color)
             return
 
-        # Draw time grid (in tab area at top)
+        # Draw background and tine lanes (cached per size), then the scrolling time grid
         tine_positions = self._get_tine_x_positions(width)
+        self._draw_static_layer(painter, tine_positions, tab_area_top, tab_area_height)
         self._draw_time_grid(painter, width, tab_area_top, tab_area_height, time_range)
 
-        # Draw tine lanes (vertical lines in tab area)
-        self._draw_tine_lanes(painter, tine_positions, tab_area_top, tab_area_height)
-
-        # Draw notes (time flows bottom to top)
-        self._draw_notes(painter, tine_positions, tab_area_top, tab_area_height, time_range)
+        # Draw notes (time flows bottom to top), limited to the repainted area
+        self._draw_notes(painter, tine_positions, tab_area_top, tab_area_height, time_range,
+                         event.rect())
 
         # Draw kalimba tines at BOTTOM
         self._draw_kalimba_tines(painter, tine_positions, tine_area_top, tine_area_height)
@@ -193,171 +372,270 @@ class KalimbaWidget(QWidget):
         # Draw playhead
         self._draw_playhead(painter, width, tab_area_top, tab_area_height, time_range)
 
+    @classmethod
+    def _build_layout_cache(cls):
+        """Precompute the static tine layout, ordered left to right by position."""
+        sorted_tines = sorted(cls.KALIMBA_17_C.values(), key=lambda tine: tine[1])
+        cls._SORTED_TINE_NUMS = tuple(tine_num for tine_num, _, _ in sorted_tines)
+        cls._SORTED_POSITIONS = tuple(pos for _, pos, _ in sorted_tines)
+        # Octave number removed for cleaner display
+        cls._SORTED_DISPLAY_NAMES = tuple(
+            name[:-1] if name[-1].isdigit() else name for _, _, name in sorted_tines
+        )
+        # Tine length varies (center is longest)
+        cls._LENGTH_FACTORS = tuple(1.0 - abs(pos) * 0.03 for pos in cls._SORTED_POSITIONS)
+
     def _get_tine_x_positions(self, width: int) -> Dict[int, float]:
         """Get x positions for each tine number."""
-        positions = {}
         margin = 30
-        usable_width = width - 2 * margin
+        num_tines = len(self._SORTED_TINE_NUMS)
+        if num_tines > 1:
+            xs = np.linspace(margin, width - margin, num_tines).tolist()
+        else:
+            xs = [float(margin)] * num_tines
+        return dict(zip(self._SORTED_TINE_NUMS, xs))
 
-        # Sort tines by position (center = 0, then alternating)
-        sorted_tines = sorted(self.KALIMBA_17_C.items(), key=lambda x: x[1][1])
+    def _draw_static_layer(self, painter: QPainter, positions: Dict[int, float],
+                           tab_top: int, tab_height: int):
+        """Draw the background and tine lanes from a pixmap cached per widget size.
 
-        num_tines = len(sorted_tines)
-        tine_spacing = usable_width / (num_tines - 1) if num_tines > 1 else usable_width
+        The time grid scrolls with the view, so it is drawn over this layer on every
+        paint; grid and lanes share one opaque color, so the order does not show.
+        """
+        width = self.width()
+        height = self.height()
+        dpr = self.devicePixelRatioF()
+        key = (width, height, dpr)
+        if self._static_layer is None or self._static_layer_key != key:
+            pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(height * dpr)))
+            pixmap.setDevicePixelRatio(dpr)
 
-        for i, (midi, (tine_num, pos, name)) in enumerate(sorted_tines):
-            x = margin + i * tine_spacing
-            positions[tine_num] = x
+            # Axis-aligned lines only, so drawn without antialiasing
+            layer = QPainter(pixmap)
 
-        return positions
+            # Background
+            layer.fillRect(0, 0, width, height, self.bg_color)
+
+            # Draw tine lanes (vertical lines in tab area)
+            self._draw_tine_lanes(layer, positions, tab_top, tab_height)
+            layer.end()
+
+            self._static_layer = pixmap
+            self._static_layer_key = key
+        painter.drawPixmap(0, 0, self._static_layer)
 
     def _draw_time_grid(self, painter: QPainter, width: int, tab_top: int, tab_height: int, time_range: float):
         """Draw time grid lines (time flows bottom to top)."""
-        painter.setPen(QPen(self.grid_color, 1))
+        painter.setPen(self._grid_pen)
 
         # Calculate appropriate grid interval
-        if time_range <= 2:
-            interval = 0.25
-        elif time_range <= 5:
-            interval = 0.5
-        elif time_range <= 15:
-            interval = 1.0
-        elif time_range <= 60:
-            interval = 5.0
-        else:
-            interval = 10.0
+        interval = self.GRID_INTERVALS[bisect.bisect_left(self.GRID_RANGE_THRESHOLDS, time_range)]
 
-        # Draw horizontal lines (time markers) - bottom to top
-        t = (int(self.view_start / interval) + 1) * interval
-        while t < self.view_end:
-            # Flip y: earlier times at bottom, later at top
-            y = tab_top + tab_height - ((t - self.view_start) / time_range * tab_height)
-            painter.drawLine(0, int(y), width, int(y))
+        # Horizontal lines (time markers) - bottom to top
+        first = (int(self.view_start / interval) + 1) * interval
+        times = np.arange(first, self.view_end, interval)
+        # Flip y: earlier times at bottom, later at top
+        ys = (tab_top + tab_height - ((times - self.view_start) / time_range * tab_height)).astype(np.int64)
 
-            # Time label
-            painter.drawText(5, int(y) - 2, f"{t:.1f}s")
-            t += interval
+        ys = ys.tolist()
+        painter.drawLines([QLine(0, y, width, y) for y in ys])
+
+        # Time labels
+        for t, y in zip(times.tolist(), ys):
+            painter.drawText(5, y - 2, f"{t:.1f}s")
 
     def _draw_tine_lanes(self, painter: QPainter, positions: Dict[int, float], tab_top: int, tab_height: int):
         """Draw vertical lane lines for each tine."""
-        painter.setPen(QPen(self.grid_color, 1, Qt.DotLine))
+        painter.setPen(self._lane_pen)
 
-        for tine_num, x in positions.items():
-            painter.drawLine(int(x), tab_top, int(x), tab_top + tab_height)
+        painter.drawLines([QLine(int(x), tab_top, int(x), tab_top + tab_height)
+                           for x in positions.values()])
 
     def _draw_notes(self, painter: QPainter, positions: Dict[int, float],
-                    tab_top: int, tab_height: int, time_range: float):
+                    tab_top: int, tab_height: int, time_range: float,
+                    clip: Optional[QRect] = None):
         """Draw detected notes on the tablature (time flows bottom to top)."""
         note_width = 24
         note_height = 20
+        bottom = tab_top + tab_height
+
+        # Time span that can touch the clip rect, padded by a note height so
+        # notes straddling its edges are kept
+        cull_start, cull_end = self.view_start, self.view_end
+        if clip is not None and tab_height > 0:
+            px_to_time = time_range / tab_height
+            cull_start = max(cull_start, self.view_start + (bottom - clip.bottom() - 1 - note_height) * px_to_time)
+            cull_end = min(cull_end, self.view_start + (bottom - clip.top() + note_height) * px_to_time)
+
+        painter.setFont(self.note_font)
+
+        # Only notes in [lo, hi) can overlap the span: earlier ones all end before it,
+        # later ones start after it
+        lo = int(np.searchsorted(self._playable_end_max, cull_start, side='left'))
+        hi = int(np.searchsorted(self._playable_times, cull_end, side='right'))
+
+        # x of each tine number (NaN where the tine has no position)
+        tine_xs = np.full(len(self._SORTED_TINE_NUMS) + 1, np.nan)
+        tine_xs[list(positions)] = list(positions.values())
+
+        idx, xs, ys, end_ys, has_line = _note_draw_params(
+            self._playable_times, self._playable_durations, self._playable_tines, tine_xs, lo, hi,
+            cull_start, self.view_start, time_range, tab_height, bottom, note_height / 2)
+        if len(idx) == 0:
+            return
 
-        font = QFont("Arial", 9, QFont.Bold)
-        painter.setFont(font)
-
-        for note in self.pitch_notes:
-            # Check if note is in view
-            if note.time + note.duration < self.view_start or note.time > self.view_end:
-                continue
-
-            # Get tine for this note
-            tine_info = self._midi_to_tine(note.midi_note)
-            if not tine_info:
-                continue
-
-            tine_num, pos, note_name = tine_info
-            x = positions.get(tine_num)
-            if x is None:
-                continue
-
-            # Calculate y position (time flows bottom to top - flip y axis)
-            y = tab_top + tab_height - ((note.time - self.view_start) / time_range * tab_height)
+        # Group notes by (color, alpha) so each group costs one brush/pen change
+        # and one drawPath instead of per-note painter state changes
+        note_paths: Dict[tuple, QPainterPath] = {}
+        duration_lines: Dict[tuple, List[QLine]] = {}
+        labels = []
 
-            # Color based on note
-            color_idx = note.midi_note % len(self.note_colors)
-            color = self.note_colors[color_idx]
+        alphas = self._playable_alphas[idx].tolist()
+        color_idxs = self._playable_color_idxs[idx].tolist()
 
-            # Adjust alpha based on confidence
-            alpha = int(150 + note.confidence * 105)
-            color.setAlpha(alpha)
+        for tine_num, x, y, alpha, color_idx in zip(
+                self._playable_tines[idx].tolist(), xs.tolist(), ys.tolist(), alphas, color_idxs):
+            key = (color_idx, alpha)
+            path = note_paths.get(key)
+            if path is None:
+                path = note_paths[key] = QPainterPath()
+                path.setFillRule(Qt.WindingFill)
 
-            # Draw note circle/rectangle
+            # Note circle/rectangle
             rect = QRectF(x - note_width / 2, y - note_height / 2, note_width, note_height)
-            painter.setBrush(QBrush(color))
-            painter.setPen(QPen(color.darker(120), 2))
-            painter.drawRoundedRect(rect, 5, 5)
-
-            # Draw note name
-            painter.setPen(QPen(Qt.white))
-            # Remove octave number for cleaner display
-            display_name = note_name[:-1] if note_name[-1].isdigit() else note_name
+            path.addRoundedRect(rect, 5, 5)
+            labels.append((rect, self._tine_display_names[tine_num]))
+
+        # Duration lines for longer notes (upward from note), bucketed like the notes
+        line_rows = np.nonzero(has_line)[0]
+        line_coords = np.column_stack((
+            xs[line_rows], ys[line_rows] - note_height / 2, xs[line_rows], end_ys[line_rows],
+        )).astype(np.int64)
+        for row, coords in zip(line_rows.tolist(), line_coords.tolist()):
+            duration_lines.setdefault((color_idxs[row], alphas[row]), []).append(QLine(*coords))
+
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        for key, path in note_paths.items():
+            brush, outline_pen, _ = self._note_style(key)
+            painter.setBrush(brush)
+            painter.setPen(outline_pen)
+            painter.drawPath(path)
+
+        for key, lines in duration_lines.items():
+            painter.setPen(self._note_style(key)[2])
+            painter.drawLines(lines)
+
+        # Draw note names on top of all notes
+        painter.setPen(self._note_text_pen)
+        for rect, display_name in labels:
             painter.drawText(rect, Qt.AlignCenter, display_name)
-
-            # Draw duration line for longer notes (upward from note)
-            if note.duration > 0.1:
-                end_y = tab_top + tab_height - ((note.time + note.duration - self.view_start) / time_range * tab_height)
-                if end_y < y - note_height / 2:
-                    painter.setPen(QPen(color, 3))
-                    painter.drawLine(int(x), int(y - note_height / 2), int(x), int(end_y))
+        painter.setRenderHint(QPainter.Antialiasing, False)
+
+    def _note_style(self, key: tuple) -> tuple:
+        """Get the cached (brush, outline pen, duration pen) for a (color, alpha) key."""
+        style = self._note_styles.get(key)
+        if style is None:
+            color_idx, alpha = key
+            # Color based on note, alpha based on confidence
+            color = QColor(self.note_colors[color_idx])
+            color.setAlpha(alpha)
+            style = (QBrush(color), QPen(color.darker(120), 2), QPen(color, 3))
+            self._note_styles[key] = style
+        return style
 
     def _draw_kalimba_tines(self, painter: QPainter, positions: Dict[int, float],
                             y_start: int, tine_height: int):
         """Draw the kalimba tine visualization at bottom (tines point upward)."""
+        width = self.width()
+        dpr = self.devicePixelRatioF()
+        key = (width, tine_height, dpr)
+        if self._tine_pixmap is None or self._tine_pixmap_key != key:
+            self._tine_pixmap = self._render_tine_pixmap(positions, width, tine_height, dpr)
+            self._tine_pixmap_key = key
+        painter.drawPixmap(0, y_start, self._tine_pixmap)
+
+    def _render_tine_pixmap(self, positions: Dict[int, float], width: int,
+                            tine_height: int, dpr: float) -> QPixmap:
+        """Render the static tine panel once into a pixmap."""
+        pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(tine_height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        # Antialiased for the rounded tine shapes
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
         margin = 5
 
         # Background for tine area
-        painter.fillRect(0, y_start, self.width(), tine_height, QColor(40, 35, 30))
+        painter.fillRect(0, 0, width, tine_height, self._tine_area_color)
 
         # Draw each tine
         tine_width = 20
-        sorted_tines = sorted(self.KALIMBA_17_C.items(), key=lambda x: x[1][1])
+        base_length = tine_height - 2 * margin
+        tine_bottom = tine_height - margin
+        painter.setFont(self.label_font)
+        tines = zip(self._SORTED_TINE_NUMS, self._SORTED_DISPLAY_NAMES, self._LENGTH_FACTORS)
 
-        for midi, (tine_num, pos, name) in sorted_tines:
+        for tine_num, display_name, length_factor in tines:
             x = positions.get(tine_num)
             if x is None:
                 continue
 
-            # Tine length varies (center is longest)
-            base_length = tine_height - 2 * margin
-            length_factor = 1.0 - abs(pos) * 0.03
             tine_length = base_length * length_factor
 
             # Draw tine (pointing upward from bottom)
-            tine_bottom = y_start + tine_height - margin
             rect = QRectF(x - tine_width / 2, tine_bottom - tine_length,
                          tine_width, tine_length)
-            painter.setBrush(QBrush(self.tine_color))
-            painter.setPen(QPen(self.tine_highlight, 1))
+            painter.setBrush(self._tine_brush)
+            painter.setPen(self._tine_pen)
             painter.drawRoundedRect(rect, 3, 3)
 
             # Draw note name on tine
-            painter.setPen(QPen(QColor(60, 40, 20)))
-            font = QFont("Arial", 7, QFont.Bold)
-            painter.setFont(font)
-            display_name = name[:-1] if name[-1].isdigit() else name
+            painter.setPen(self._tine_text_pen)
             painter.drawText(rect, Qt.AlignCenter, display_name)
 
+        painter.end()
+        return pixmap
+
     def _draw_playhead(self, painter: QPainter, width: int, tab_top: int, tab_height: int, time_range: float):
         """Draw the playback position indicator (fixed after initial period)."""
+        y = self._playhead_y(tab_top, tab_height, time_range)
+
+        painter.setPen(self._playhead_pen)
+        painter.drawLine(0, int(y), width, int(y))
+
+        # Draw time indicator
+        painter.setFont(self.label_font)
+        painter.drawText(width - 60, int(y) - 2, f"{self.playback_position:.2f}s")
+
+    def _playhead_y(self, tab_top: int, tab_height: int, time_range: float) -> float:
+        """Get the y coordinate of the playhead line."""
         # Threshold: 20% of view range - playhead moves until reaching this point
         threshold = time_range * 0.2
 
         if self.view_start == 0 and self.playback_position < threshold:
             # At the beginning: playhead moves with playback position
             # Calculate y based on actual position (time flows bottom to top)
-            y = tab_top + tab_height - ((self.playback_position - self.view_start) / time_range * tab_height)
-        else:
-            # After threshold: playhead stays at fixed position (20% from bottom)
-            y = tab_top + tab_height * 0.8
-
-        painter.setPen(QPen(self.playhead_color, 2))
-        painter.drawLine(0, int(y), width, int(y))
+            return tab_top + tab_height - ((self.playback_position - self.view_start) / time_range * tab_height)
+        # After threshold: playhead stays at fixed position (20% from bottom)
+        return tab_top + tab_height * 0.8
 
-        # Draw time indicator
-        painter.drawText(width - 60, int(y) - 2, f"{self.playback_position:.2f}s")
+    def _playhead_rect(self) -> Optional[QRect]:
+        """Get the widget area covered by the playhead line and its time label."""
+        time_range = self.view_end - self.view_start
+        if time_range <= 0:
+            return None
+        y = int(self._playhead_y(0, self.height() - self.TINE_AREA_HEIGHT, time_range))
+        return QRect(0, y - 16, self.width(), 20)
 
     def wheelEvent(self, event):
         """Handle mouse wheel for zooming."""
-        delta = event.angleDelta().y()
+        # High-resolution wheels send fractions of a notch; zoom once per full notch
+        self._wheel_delta += event.angleDelta().y()
+        if abs(self._wheel_delta) < 120:
+            return
+        delta = self._wheel_delta
+        self._wheel_delta = 0
 
         if delta > 0:
             # Zoom in
@@ -384,7 +662,17 @@ class KalimbaWidget(QWidget):
             new_start -= (new_end - self.duration)
             new_end = self.duration
 
-        self.view_start = max(0, new_start)
+        new_start = max(0, new_start)
+
+        # Skip changes below one pixel of the time axis (e.g. zoom already clamped)
+        min_delta = (self.view_end - self.view_start) / max(1, self.height() - self.TINE_AREA_HEIGHT)
+        if abs(new_start - self.view_start) < min_delta and abs(new_end - self.view_end) < min_delta:
+            return
+
+        self.view_start = new_start
         self.view_end = new_end
-        self.update()
+        self._schedule_update()
         self.view_range_changed.emit(self.view_start, self.view_end)
+
+
+KalimbaWidget._build_layout_cache()
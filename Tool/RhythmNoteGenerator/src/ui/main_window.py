@@ -2,10 +2,14 @@
 Main window for the Rhythm Note Generator application.
 """
 
+import bisect
+import functools
 import os
+import platform
 import traceback
 from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import Optional, Tuple
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -14,7 +18,7 @@ from PySide6.QtWidgets import (
     QLineEdit, QScrollArea, QSplitter, QProgressDialog,
     QStatusBar, QTabWidget, QTextEdit, QScrollBar, QCheckBox
 )
-from PySide6.QtCore import Qt, QTimer, Signal, Slot, QThread
+from PySide6.QtCore import Qt, QTimer, Signal, Slot, QObject, QRunnable, QThreadPool
 
 from PySide6.QtGui import QAction, QKeySequence
 
@@ -22,71 +26,112 @@ from .waveform_widget import WaveformWidget
 from .note_lane_widget import NoteLaneWidget
 from .kalimba_widget import KalimbaWidget
 from ..core.audio_analyzer import AudioAnalyzer, AudioAnalysisResult, PitchNote
-from ..core.note_generator import NoteGenerator, NoteChart, Note, Difficulty
-from ..core.template_manager import TemplateManager
+from ..core.note_generator import NoteGenerator, NoteChart, Note, Difficulty, NOTE_SORT_KEY
+from ..core.template_manager import get_template_manager
+from ..core.pitch_process import PitchDetectionProcess, PitchDetectionError
+from ..core._jit import njit
 
 # Use pygame for audio playback (more reliable on Windows)
 import pygame
 import numpy as np
 
-
-class AnalysisWorker(QThread):
-    """Background worker for audio analysis."""
-    finished = Signal(object)  # AudioAnalysisResult
+# Length of the music pieces handed to the mixer; a seek only copies one piece
+MUSIC_CHUNK_SECONDS = 2.0
+
+# Mixer buffer size (samples) per OS; override with RNG_AUDIO_BUFFER
+_MIXER_BUFFER_DEFAULTS = {'Windows': 512, 'Linux': 1024, 'Darwin': 1024}
+
+
+def _mixer_buffer_size() -> int:
+    """Get the mixer buffer size for this platform."""
+    override = os.environ.get('RNG_AUDIO_BUFFER', '')
+    if override.isdigit() and int(override) > 0:
+        return int(override)
+    return _MIXER_BUFFER_DEFAULTS.get(platform.system(), 1024)
+
+
+@njit(cache=True)
+def _lanes_to_fire(times: np.ndarray, lanes: np.ndarray, start: int, end: int,
+                   window_start: float, lane_count: int) -> np.ndarray:
+    """Mask of sound lanes hit by notes[start:end] at or after window_start."""
+    fire = np.zeros(lane_count, dtype=np.uint8)
+    for i in range(start, end):
+        if times[i] >= window_start:
+            fire[lanes[i] % lane_count] = 1
+    return fire
+
+
+@functools.lru_cache(maxsize=None)
+def _note_sound_buffers(sample_rate: int, duration: float, frequencies: tuple) -> tuple:
+    """Synthesize int16 stereo beep buffers, one per frequency (cached per process)."""
+    # Generate all sine waves at once, one row per frequency; float64 keeps every
+    # int16 sample identical to synthesizing each beep on its own
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    waves = np.sin((2 * np.pi * np.asarray(frequencies, dtype=np.float64))[:, None] * t)
+
+    # Apply a shared envelope (attack/release) to avoid clicks
+    envelope = np.ones_like(t)
+    attack_samples = int(0.005 * sample_rate)  # 5ms attack
+    release_samples = int(0.02 * sample_rate)  # 20ms release
+    envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
+    envelope[-release_samples:] = np.linspace(1, 0, release_samples)
+    waves *= envelope
+
+    # Convert to 16-bit integer stereo; each [k] slice is C-contiguous
+    stereo = np.repeat((waves * 32767 * 0.5).astype(np.int16)[:, :, None], 2, axis=2)
+    stereo.flags.writeable = False
+    return tuple(stereo)
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by background runnables (QRunnable is not a QObject)."""
+    finished = Signal(object)  # Task result; AnalysisRunnable sends (result, pcm, pcm error)
     progress = Signal(int, str)  # Progress percent and message
     error = Signal(str)
 
-    def __init__(self, analyzer: AudioAnalyzer, file_path: str):
-        super().__init__()
-        self.analyzer = analyzer
-        self.file_path = file_path
-
-    def _progress_callback(self, percent: int, message: str):
-        """Callback for progress updates from analyzer."""
-        self.progress.emit(percent, message)
-
-    def run(self):
-        try:
-            result = self.analyzer.analyze(
-                self.file_path,
-                progress_callback=self._progress_callback
-            )
-            self.finished.emit(result)
-        except Exception as e:
-            self.error.emit(f"{e}\n{traceback.format_exc()}")
 
+class AnalysisRunnable(QRunnable):
+    """Pooled background task for audio analysis.
 
-class PitchDetectionWorker(QThread):
-    """Background worker for pitch detection."""
-    finished = Signal(list)  # List of PitchNote
-    progress = Signal(int, str)   # Progress percent and message
-    error = Signal(str)
+    Also decodes the file for playback at the mixer's format; finished carries
+    (analysis result, playback frames or None, playback error message).
+    """
 
-    def __init__(self, analyzer: AudioAnalyzer, file_path: str, method: str = "pyin"):
+    def __init__(self, analyzer: AudioAnalyzer, file_path: str):
         super().__init__()
+        self.signals = WorkerSignals()
         self.analyzer = analyzer
         self.file_path = file_path
-        self.method = method
+        mixer_freq, _, mixer_channels = pygame.mixer.get_init()
+        self.playback_format = (mixer_freq, mixer_channels)
 
     def _progress_callback(self, percent: int, message: str):
         """Callback for progress updates from analyzer."""
-        self.progress.emit(percent, message)
+        self.signals.progress.emit(percent, message)
 
     def run(self):
         try:
-            pitch_notes = self.analyzer.detect_pitches(
+            result = self.analyzer.analyze(
                 self.file_path,
-                method=self.method,
                 progress_callback=self._progress_callback
             )
-            self.finished.emit(pitch_notes)
+            self.signals.progress.emit(98, "Preparing playback audio...")
+            playback_pcm, playback_error = None, ""
+            try:
+                playback_pcm = self.analyzer.load_playback_pcm(self.file_path,
+                                                               *self.playback_format)
+            except Exception as e:
+                playback_error = str(e)
+            self.signals.finished.emit((result, playback_pcm, playback_error))
         except Exception as e:
-            self.error.emit(f"{e}\n{traceback.format_exc()}")
+            self.signals.error.emit(f"{e}\n{traceback.format_exc()}")
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
 
+    position_changed = Signal(float)  # Playback position in seconds
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Rhythm Note Generator")
@@ -95,7 +140,7 @@ class MainWindow(QMainWindow):
         # Core components
         self.analyzer = AudioAnalyzer()
         self.generator: Optional[NoteGenerator] = None
-        self.template_manager = TemplateManager()
+        self.template_manager = get_template_manager()
 
         # Data
         self.current_file: Optional[str] = None
@@ -103,21 +148,62 @@ class MainWindow(QMainWindow):
         self.chart: Optional[NoteChart] = None
 
         # Audio playback with pygame (init both mixer and time)
+        pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=_mixer_buffer_size())
         pygame.init()
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+        pygame.mixer.init()
         self.is_playing = False
-        self.playback_start_time = 0
+        self.playback_start_time = 0.0  # perf_counter() at last play/seek
         self.playback_offset = 0.0
         self.last_played_note_idx = -1  # Track which notes have been played
+        # Chart note arrays (and their version) last used for playback, and whether their times are sorted
+        self._playback_arrays = None
+        self._playback_arrays_version = -1
+        self._playback_times_sorted = True
 
         # Generate note sounds (different pitch per lane)
         self.note_sounds_enabled = True
         self.note_sounds = self._generate_note_sounds()
-
-        # Playback timer
+        # Reserved mixer channels: one per note lane, then one for the music
+        channels = self._reserve_mixer_channels(len(self.note_sounds) + 1)
+        self.note_channels = channels[:-1]
+        self.music_channel = channels[-1]
+        self.music_pcm: Optional[np.ndarray] = None  # Decoded int16 frames of the current file
+        self._music_error = ""
+        # The music streams in MUSIC_CHUNK_SECONDS pieces queued on music_channel
+        self._music_chunk_frames = int(MUSIC_CHUNK_SECONDS * pygame.mixer.get_init()[0])
+        self._music_next_frame: Optional[int] = None  # Start of the next piece to queue
+
+        # Playback timers: visuals refresh at ~30 fps, note sounds fire from a
+        # separate precise timer so their timing does not wait on repaints
         self.playback_timer = QTimer()
-        self.playback_timer.setInterval(16)  # ~60 fps for better note timing
+        self.playback_timer.setInterval(33)
         self.playback_timer.timeout.connect(self._update_playback_position)
+        self.note_timer = QTimer()
+        self.note_timer.setTimerType(Qt.PreciseTimer)
+        self.note_timer.setInterval(4)
+        self.note_timer.timeout.connect(self._update_note_sounds)
+
+        # Pitch detection runs in a child process (pyin is CPU-bound and would
+        # contend for the GIL with the UI); its progress and result are polled
+        self.pitch_process = PitchDetectionProcess()
+        self._pitch_result = None  # Pending AsyncResult of the running detection
+        self.pitch_poll_timer = QTimer()
+        self.pitch_poll_timer.setInterval(50)
+        self.pitch_poll_timer.timeout.connect(self._poll_pitch_detection)
+
+        # Pitch detection progress is shown at most once per frame; updates arriving
+        # in between are coalesced and only the latest one is applied
+        self._pending_pitch_progress: Optional[Tuple[int, str]] = None
+        self.pitch_progress_timer = QTimer()
+        self.pitch_progress_timer.setSingleShot(True)
+        self.pitch_progress_timer.setInterval(16)
+        self.pitch_progress_timer.timeout.connect(self._flush_pitch_progress)
+
+        # Export preview refreshes are debounced, so a burst of edits re-exports once
+        self.preview_timer = QTimer()
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self._do_update_preview)
 
         # Setup UI
         self._setup_ui()
@@ -231,6 +317,7 @@ class MainWindow(QMainWindow):
         playback_layout.addWidget(self.position_slider)
 
         self.position_label = QLabel("0:00 / 0:00")
+        self._position_label_secs = (0, 0)  # (position, duration) seconds shown in position_label
         playback_layout.addWidget(self.position_label)
 
         # Note sounds checkbox
@@ -425,7 +512,7 @@ class MainWindow(QMainWindow):
         preview_controls.addWidget(self.preview_template_combo)
 
         refresh_preview_btn = QPushButton("Refresh")
-        refresh_preview_btn.clicked.connect(self._update_preview)
+        refresh_preview_btn.clicked.connect(self._do_update_preview)
         preview_controls.addWidget(refresh_preview_btn)
 
         preview_controls.addStretch()
@@ -491,6 +578,11 @@ class MainWindow(QMainWindow):
         # Waveform click to seek
         self.waveform_widget.time_clicked.connect(self._on_time_clicked)
 
+        # Playback position fan-out to the timeline views
+        self.position_changed.connect(self.waveform_widget.set_playback_position)
+        self.position_changed.connect(self.lane_widget.set_playback_position)
+        self.position_changed.connect(self.kalimba_widget.set_playback_position)
+
         # Lane view range changes - only update scrollbar (independent zoom)
         self.lane_widget.view_range_changed.connect(self._on_lane_view_range_changed)
 
@@ -500,6 +592,7 @@ class MainWindow(QMainWindow):
         # Lane note editing signals
         self.lane_widget.note_added.connect(self._add_note)
         self.lane_widget.note_deleted.connect(self._delete_note)
+        self.lane_widget.note_moved.connect(self._on_note_moved)
 
     @Slot()
     def _load_file(self):
@@ -534,11 +627,11 @@ class MainWindow(QMainWindow):
         self.analysis_progress.show()
 
         # Run analysis in background
-        self.worker = AnalysisWorker(self.analyzer, file_path)
-        self.worker.progress.connect(self._on_analysis_progress)
-        self.worker.finished.connect(self._on_analysis_complete_new)
-        self.worker.error.connect(self._on_analysis_error_new)
-        self.worker.start()
+        self.worker = AnalysisRunnable(self.analyzer, file_path)
+        self.worker.signals.progress.connect(self._on_analysis_progress)
+        self.worker.signals.finished.connect(self._on_analysis_complete_new)
+        self.worker.signals.error.connect(self._on_analysis_error_new)
+        QThreadPool.globalInstance().start(self.worker)
 
     def _on_analysis_progress(self, percent: int, message: str):
         """Update audio analysis progress."""
@@ -547,10 +640,11 @@ class MainWindow(QMainWindow):
             self.analysis_progress.setLabelText(message)
         self.statusBar().showMessage(f"Audio analysis: {message}")
 
-    def _on_analysis_complete_new(self, result: AudioAnalysisResult):
-        """Handle completed audio analysis."""
+    def _on_analysis_complete_new(self, payload: tuple):
+        """Handle completed audio analysis (payload as sent by AnalysisRunnable)."""
         if hasattr(self, 'analysis_progress') and self.analysis_progress:
             self.analysis_progress.close()
+        result, self.music_pcm, self._music_error = payload
         self._on_analysis_complete(result, None)
 
     def _on_analysis_error_new(self, error: str):
@@ -578,15 +672,14 @@ class MainWindow(QMainWindow):
         self.tempo_label.setText(f"{result.tempo:.1f}")
         self.generate_btn.setEnabled(True)
 
-        # Load audio for playback with pygame
-        try:
-            pygame.mixer.music.load(self.current_file)
+        # Playback plays the decoded frames on the reserved music channel
+        if self.music_pcm is not None:
             self.play_btn.setEnabled(True)
             self.stop_btn.setEnabled(True)
             self.position_slider.setEnabled(True)
             self.position_slider.setRange(0, int(result.duration * 1000))
-        except Exception as e:
-            self.statusBar().showMessage(f"Playback not available: {e}")
+        else:
+            self.statusBar().showMessage(f"Playback not available: {self._music_error}")
             self.play_btn.setEnabled(False)
 
         # Update scrollbars
@@ -625,56 +718,50 @@ class MainWindow(QMainWindow):
         self.lane_widget.set_chart(self.chart)
 
         # Update stats
-        self.notes_label.setText(str(len(self.chart.notes)))
-        if self.chart.duration > 0:
-            density = len(self.chart.notes) / self.chart.duration
-            self.density_label.setText(f"{density:.2f}")
+        self._update_chart_stats()
         self.diff_value_label.setText(f"{self.chart.difficulty_value}/10")
 
         self.export_btn.setEnabled(True)
         self._update_preview()
 
-        self.statusBar().showMessage(f"Generated {len(self.chart.notes)} notes")
+        self.statusBar().showMessage(f"Generated {self.chart.note_count} notes")
 
     @Slot()
     def _toggle_playback(self):
         """Toggle audio playback."""
         if self.is_playing:
             # Pause
-            pygame.mixer.music.pause()
+            self.music_channel.stop()
             self.is_playing = False
             self.play_btn.setText("Play")
-            self.playback_timer.stop()
+            self._stop_playback_timers()
             # Save current position
-            self.playback_offset += (pygame.time.get_ticks() - self.playback_start_time) / 1000.0
+            self.playback_offset += perf_counter() - self.playback_start_time
         else:
-            # Play
-            if self.playback_offset > 0:
-                pygame.mixer.music.unpause()
-            else:
-                pygame.mixer.music.play()
+            # Play (resumes from the saved or seeked position)
+            self._play_music_from(self.playback_offset)
             self.is_playing = True
             self.play_btn.setText("Pause")
-            self.playback_start_time = pygame.time.get_ticks()
-            self.playback_timer.start()
+            self.playback_start_time = perf_counter()
+            self._start_playback_timers()
 
     @Slot()
     def _stop_playback(self):
         """Stop audio playback."""
-        pygame.mixer.music.stop()
+        self.music_channel.stop()
+        self._music_next_frame = None
         self.is_playing = False
         self.play_btn.setText("Play")
-        self.playback_timer.stop()
+        self._stop_playback_timers()
         self.playback_offset = 0.0
         self.last_played_note_idx = -1  # Reset note tracking
         self.position_slider.setValue(0)
         self._update_position_label(0)
-        self.waveform_widget.set_playback_position(0)
-        self.lane_widget.set_playback_position(0)
+        self.position_changed.emit(0.0)
 
     def _on_slider_pressed(self):
         """Handle slider press - pause updates."""
-        self.playback_timer.stop()
+        self._stop_playback_timers()
 
     def _on_slider_released(self):
         """Handle slider release - seek to position."""
@@ -686,18 +773,59 @@ class MainWindow(QMainWindow):
 
         # Seek in pygame
         if self.is_playing:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.play(start=position_sec)
-            self.playback_start_time = pygame.time.get_ticks()
+            self._play_music_from(position_sec)
+            self.playback_start_time = perf_counter()
             self.playback_offset = position_sec
-            self.playback_timer.start()
+            self._start_playback_timers()
         else:
             self.playback_offset = position_sec
 
         self._update_position_label(position_ms)
-        self.waveform_widget.set_playback_position(position_sec)
-        self.lane_widget.set_playback_position(position_sec)
-        self.kalimba_widget.set_playback_position(position_sec)
+        self.position_changed.emit(position_sec)
+
+    def _play_music_from(self, position_sec: float):
+        """Restart the music channel at a position in the decoded audio."""
+        self.music_channel.stop()
+        self._music_next_frame = None
+        if self.music_pcm is None:
+            return
+        start = max(0, int(position_sec * pygame.mixer.get_init()[0]))
+        if start < len(self.music_pcm):
+            self._music_next_frame = start
+            self.music_channel.play(self._next_music_chunk())
+            self._queue_music_chunk()
+
+    def _next_music_chunk(self) -> pygame.mixer.Sound:
+        """Make a Sound of the next piece of music and advance past it."""
+        start = self._music_next_frame
+        end = min(start + self._music_chunk_frames, len(self.music_pcm))
+        self._music_next_frame = end if end < len(self.music_pcm) else None
+        return pygame.sndarray.make_sound(self.music_pcm[start:end])
+
+    def _queue_music_chunk(self):
+        """Keep the next piece of music queued behind the one playing."""
+        if self._music_next_frame is None:
+            return
+        if not self.music_channel.get_busy():
+            # The queue ran dry (the GUI thread stalled or the slider was held), so the
+            # next piece is behind the clock: restart the music at the playback position
+            self._play_music_from(self._current_playback_position())
+        elif self.music_channel.get_queue() is None:
+            self.music_channel.queue(self._next_music_chunk())
+
+    def _start_playback_timers(self):
+        """Start the visualization and note sound timers."""
+        self.playback_timer.start()
+        self.note_timer.start()
+
+    def _stop_playback_timers(self):
+        """Stop the visualization and note sound timers."""
+        self.playback_timer.stop()
+        self.note_timer.stop()
+
+    def _current_playback_position(self) -> float:
+        """Get the current playback position in seconds."""
+        return self.playback_offset + (perf_counter() - self.playback_start_time)
 
     def _update_playback_position(self):
         """Update visualization playback position."""
@@ -705,25 +833,27 @@ class MainWindow(QMainWindow):
             return
 
         # Calculate current position
-        elapsed = (pygame.time.get_ticks() - self.playback_start_time) / 1000.0
-        position_sec = self.playback_offset + elapsed
+        position_sec = self._current_playback_position()
 
         # Check if playback finished
         if self.analysis and position_sec >= self.analysis.duration:
             self._stop_playback()
             return
+        self._queue_music_chunk()
 
         position_ms = int(position_sec * 1000)
 
+        # Nothing listens to the slider's own signals during playback
+        self.position_slider.blockSignals(True)
         self.position_slider.setValue(position_ms)
+        self.position_slider.blockSignals(False)
         self._update_position_label(position_ms)
-        self.waveform_widget.set_playback_position(position_sec)
-        self.lane_widget.set_playback_position(position_sec)
-        self.kalimba_widget.set_playback_position(position_sec)
+        self.position_changed.emit(position_sec)
 
-        # Play note sounds
-        if self.note_sounds_enabled and self.chart and self.chart.notes:
-            self._play_notes_at_position(position_sec)
+    def _update_note_sounds(self):
+        """Play note sounds reached since the last tick of the note timer."""
+        if self.is_playing and self.note_sounds_enabled and self.chart and self.chart.notes:
+            self._play_notes_at_position(self._current_playback_position())
 
     def _play_notes_at_position(self, position_sec: float):
         """Play note sounds for notes at current position."""
@@ -733,21 +863,20 @@ class MainWindow(QMainWindow):
         # Find notes that should play (within a small window)
         tolerance = 0.05  # 50ms tolerance
 
-        for i, note in enumerate(self.chart.notes):
-            # Skip already played notes
-            if i <= self.last_played_note_idx:
-                continue
-
-            # Check if note is within play window
-            if note.time <= position_sec + tolerance:
-                if note.time >= position_sec - tolerance:
-                    # Play the note sound
-                    lane = note.lane % len(self.note_sounds)
-                    self.note_sounds[lane].play()
-                self.last_played_note_idx = i
-            else:
-                # Notes are sorted by time, so we can stop early
-                break
+        # Notes after the last played one, up to the first one past the window
+        arrays = self._get_playback_arrays()
+        start = self.last_played_note_idx + 1
+        end = self._first_note_index(arrays.times, start, position_sec + tolerance, side='right')
+        if end <= start:
+            return
+
+        # Play the notes inside the window (earlier ones were skipped over),
+        # once per lane; each lane restarts its beep on its own channel
+        fire = _lanes_to_fire(arrays.times, arrays.lanes, start, end,
+                              position_sec - tolerance, len(self.note_sounds))
+        for lane in np.flatnonzero(fire).tolist():
+            self.note_channels[lane].play(self.note_sounds[lane])
+        self.last_played_note_idx = end - 1
 
     def _reset_note_tracking(self, position_sec: float):
         """Reset note tracking index based on seek position."""
@@ -756,46 +885,50 @@ class MainWindow(QMainWindow):
             return
 
         # Find the last note before the seek position
-        self.last_played_note_idx = -1
-        for i, note in enumerate(self.chart.notes):
-            if note.time < position_sec:
-                self.last_played_note_idx = i
-            else:
-                break
+        times = self._get_playback_arrays().times
+        self.last_played_note_idx = self._first_note_index(times, 0, position_sec, side='left') - 1
+
+    def _get_playback_arrays(self):
+        """Get the chart's note arrays, checking once per arrays version whether times are sorted."""
+        arrays = self.chart.note_arrays()
+        if arrays is not self._playback_arrays or arrays.version != self._playback_arrays_version:
+            self._playback_arrays = arrays
+            self._playback_arrays_version = arrays.version
+            self._playback_times_sorted = bool(np.all(arrays.times[1:] >= arrays.times[:-1]))
+        return arrays
+
+    def _first_note_index(self, times: np.ndarray, start: int, limit: float, side: str) -> int:
+        """Index of the first note from start with time past limit (len(times) if none).
+
+        side='right' treats times equal to limit as not past it, 'left' as past it.
+        Notes are normally time-sorted and found by binary search; after an edit
+        that leaves them unsorted, the first such note after start is used.
+        """
+        if self._playback_times_sorted:
+            return max(start, int(np.searchsorted(times, limit, side=side)))
+        rest = times[start:]
+        past = np.nonzero(rest > limit if side == 'right' else rest >= limit)[0]
+        return start + int(past[0]) if len(past) else len(times)
 
     def _generate_note_sounds(self) -> list:
         """Generate beep sounds for each lane (different frequencies)."""
-        sounds = []
         sample_rate = 44100
         duration = 0.08  # 80ms beep
 
         # Frequencies for each lane (pentatonic scale - pleasant sounding)
-        frequencies = [523, 587, 659, 784, 880, 988]  # C5, D5, E5, G5, A5, B5
-
-        for freq in frequencies:
-            # Generate sine wave
-            t = np.linspace(0, duration, int(sample_rate * duration), False)
-            wave = np.sin(2 * np.pi * freq * t)
-
-            # Apply envelope (attack/release) to avoid clicks
-            envelope = np.ones_like(wave)
-            attack_samples = int(0.005 * sample_rate)  # 5ms attack
-            release_samples = int(0.02 * sample_rate)  # 20ms release
-            envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-            envelope[-release_samples:] = np.linspace(1, 0, release_samples)
-            wave *= envelope
-
-            # Convert to 16-bit integer
-            wave = (wave * 32767 * 0.5).astype(np.int16)
+        frequencies = (523, 587, 659, 784, 880, 988)  # C5, D5, E5, G5, A5, B5
 
-            # Create stereo
-            stereo = np.column_stack((wave, wave))
+        # Create pygame sounds from the shared sample buffers
+        return [pygame.sndarray.make_sound(stereo)
+                for stereo in _note_sound_buffers(sample_rate, duration, frequencies)]
 
-            # Create pygame sound
-            sound = pygame.sndarray.make_sound(stereo)
-            sounds.append(sound)
-
-        return sounds
+    @staticmethod
+    def _reserve_mixer_channels(count: int) -> list:
+        """Reserve mixer channels so note beeps and music never steal each other's."""
+        if pygame.mixer.get_num_channels() < count:
+            pygame.mixer.set_num_channels(count)
+        pygame.mixer.set_reserved(count)
+        return [pygame.mixer.Channel(k) for k in range(count)]
 
     def _on_note_sounds_changed(self, state: int):
         """Handle note sounds checkbox change."""
@@ -803,10 +936,13 @@ class MainWindow(QMainWindow):
 
     def _update_position_label(self, position_ms: int):
         """Update the position label."""
-        duration_ms = int(self.analysis.duration * 1000) if self.analysis else 0
-        pos_str = f"{int(position_ms // 60000)}:{int((position_ms // 1000) % 60):02d}"
-        dur_str = f"{int(duration_ms // 60000)}:{int((duration_ms // 1000) % 60):02d}"
-        self.position_label.setText(f"{pos_str} / {dur_str}")
+        pos_sec = int(position_ms // 1000)
+        dur_sec = int(self.analysis.duration) if self.analysis else 0
+        # The text only changes once per second; skip reformatting and relayout otherwise
+        if (pos_sec, dur_sec) == self._position_label_secs:
+            return
+        self._position_label_secs = (pos_sec, dur_sec)
+        self.position_label.setText(f"{pos_sec // 60}:{pos_sec % 60:02d} / {dur_sec // 60}:{dur_sec % 60:02d}")
 
     @Slot(float)
     def _on_time_clicked(self, time: float):
@@ -818,17 +954,14 @@ class MainWindow(QMainWindow):
         self._reset_note_tracking(time)
 
         if self.is_playing:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.play(start=time)
-            self.playback_start_time = pygame.time.get_ticks()
+            self._play_music_from(time)
+            self.playback_start_time = perf_counter()
             self.playback_offset = time
         else:
             self.playback_offset = time
 
         self._update_position_label(position_ms)
-        self.waveform_widget.set_playback_position(time)
-        self.lane_widget.set_playback_position(time)
-        self.kalimba_widget.set_playback_position(time)
+        self.position_changed.emit(time)
 
     @Slot(float, float)
     def _on_lane_view_range_changed(self, start: float, end: float):
@@ -849,25 +982,59 @@ class MainWindow(QMainWindow):
         """Add a new note."""
         if self.chart:
             note = Note(time=time, lane=lane, duration=0.0)
-            self.chart.notes.append(note)
-            self.chart.notes.sort(key=lambda n: (n.time, n.lane))
-            self._refresh_chart_display()
+            # Notes are kept sorted, so insert in place instead of re-sorting
+            index = bisect.bisect_right(self.chart.notes, NOTE_SORT_KEY(note), key=NOTE_SORT_KEY)
+            self.chart.insert_note(index, note)
+            self.lane_widget.note_inserted(index)
+            self._refresh_note_edit(note)
+
+    @Slot(int, float, int)
+    def _on_note_moved(self, index: int, time: float, lane: int):
+        """Restore note order after a note is dragged to a new time or lane."""
+        if not self.chart:
+            return
+        notes = self.chart.notes
+        key = NOTE_SORT_KEY(notes[index])
+        # The rest of the list is still sorted, so only the moved note can be out of place
+        if ((index > 0 and NOTE_SORT_KEY(notes[index - 1]) > key)
+                or (index + 1 < len(notes) and key > NOTE_SORT_KEY(notes[index + 1]))):
+            note = self.chart.pop_note(index)
+            new_index = bisect.bisect_right(notes, key, key=NOTE_SORT_KEY)
+            self.chart.insert_note(new_index, note)
+            self.lane_widget.note_reordered(index, new_index)
+        # The waveform's note markers were not repainted during the drag
+        self.waveform_widget.set_chart(self.chart)
+        self._update_preview()
 
     @Slot(int)
     def _delete_note(self, index: int):
         """Delete a note."""
         if self.chart and 0 <= index < len(self.chart.notes):
-            del self.chart.notes[index]
-            self._refresh_chart_display()
+            note = self.chart.pop_note(index)
+            self.lane_widget.note_removed(index, note)
+            self._refresh_note_edit(note)
+
+    def _refresh_note_edit(self, note: Note):
+        """Refresh displays after a single note was added or removed, repainting only its area."""
+        self.waveform_widget.update_note_area(note)
+        self._update_chart_stats()
+        self._update_preview()
 
     def _refresh_chart_display(self):
         """Refresh all chart displays."""
         if self.chart:
+            self.chart.invalidate_arrays()
             self.waveform_widget.set_chart(self.chart)
             self.lane_widget.set_chart(self.chart)
-            self.notes_label.setText(str(len(self.chart.notes)))
+            self._update_chart_stats()
             self._update_preview()
 
+    def _update_chart_stats(self):
+        """Show the chart's note count and density."""
+        self.notes_label.setText(str(self.chart.note_count))
+        density = self.chart.density
+        self.density_label.setText("-" if density is None else f"{density:.2f}")
+
     def _zoom(self, factor: float):
         """Zoom lane widget view by factor (independent from waveform)."""
         current_range = self.lane_widget.view_end - self.lane_widget.view_start
@@ -935,20 +1102,18 @@ class MainWindow(QMainWindow):
         view_width = self.lane_widget.view_end - self.lane_widget.view_start
         scrollable_range = self.analysis.duration - view_width
 
+        # Block signals to prevent feedback loop
+        self.timeline_scrollbar.blockSignals(True)
         if scrollable_range <= 0:
             self.timeline_scrollbar.setValue(0)
             self.timeline_scrollbar.setEnabled(False)
-            return
-
-        self.timeline_scrollbar.setEnabled(True)
-
-        # Calculate scrollbar value based on lane widget position
-        max_val = self.timeline_scrollbar.maximum()
-        value = int((self.lane_widget.view_start / scrollable_range) * max_val)
+        else:
+            self.timeline_scrollbar.setEnabled(True)
 
-        # Block signals to prevent feedback loop
-        self.timeline_scrollbar.blockSignals(True)
-        self.timeline_scrollbar.setValue(min(value, max_val))
+            # Calculate scrollbar value based on lane widget position
+            max_val = self.timeline_scrollbar.maximum()
+            value = int((self.lane_widget.view_start / scrollable_range) * max_val)
+            self.timeline_scrollbar.setValue(min(value, max_val))
         self.timeline_scrollbar.blockSignals(False)
 
     def _on_kalimba_scrollbar_changed(self, value: int):
@@ -979,12 +1144,12 @@ class MainWindow(QMainWindow):
         scrollable_range = self.analysis.duration - view_width
 
         if scrollable_range <= 0:
-            self.kalimba_scrollbar.setValue(0)
-            return
-
-        max_val = self.kalimba_scrollbar.maximum()
-        value = int((self.kalimba_widget.view_start / scrollable_range) * max_val)
+            value = 0
+        else:
+            max_val = self.kalimba_scrollbar.maximum()
+            value = int((self.kalimba_widget.view_start / scrollable_range) * max_val)
 
+        # Block signals to prevent feedback loop
         self.kalimba_scrollbar.blockSignals(True)
         self.kalimba_scrollbar.setValue(value)
         self.kalimba_scrollbar.blockSignals(False)
@@ -1028,24 +1193,79 @@ class MainWindow(QMainWindow):
         self.pitch_progress.setMinimumDuration(0)
         self.pitch_progress.setMinimumWidth(350)
         self.pitch_progress.setValue(0)
+        self.pitch_progress.canceled.connect(self._cancel_pitch_detection)
         self.pitch_progress.show()
 
-        # Run in background thread with selected method
-        self.pitch_worker = PitchDetectionWorker(self.analyzer, self.current_file, method)
-        self.pitch_worker.progress.connect(self._on_pitch_progress)
-        self.pitch_worker.finished.connect(self._on_pitch_detection_complete)
-        self.pitch_worker.error.connect(self._on_pitch_detection_error)
-        self.pitch_worker.start()
+        # Run in the worker process with selected method
+        self._pitch_result = self.pitch_process.submit(self.analyzer, self.current_file, method)
+        self.pitch_poll_timer.start()
+
+    def _poll_pitch_detection(self):
+        """Forward progress from the pitch detection process and handle its result."""
+        for percent, message in self.pitch_process.progress_updates():
+            self._on_pitch_progress(percent, message)
+
+        result = self._pitch_result
+        if result is None or not result.ready():
+            return
+        self.pitch_poll_timer.stop()
+        self._pitch_result = None
+        try:
+            pitch_notes = result.get()
+        except PitchDetectionError as e:
+            self._on_pitch_detection_error(str(e))  # Carries the worker's traceback
+            return
+        except Exception as e:
+            self._on_pitch_detection_error(f"{e}\n{traceback.format_exc()}")
+            return
+        self._on_pitch_detection_complete(pitch_notes)
+
+    @Slot()
+    def _cancel_pitch_detection(self):
+        """Abandon the running pitch detection when its dialog is cancelled."""
+        if self._pitch_result is None:
+            return  # Closing the dialog after a result also emits canceled
+        self.pitch_poll_timer.stop()
+        self._pitch_result = None
+        self.pitch_process.shutdown()  # Also frees a worker that died mid-job
+        self._cancel_pitch_progress()
+
+        self.detect_pitch_btn.setEnabled(True)
+        self.detect_pitch_btn.setText("Detect Pitches")
+        self.statusBar().showMessage("Pitch detection cancelled")
 
     def _on_pitch_progress(self, percent: int, message: str):
-        """Update pitch detection progress."""
+        """Update pitch detection progress, throttled to one UI update per frame."""
+        if self.pitch_progress_timer.isActive():
+            self._pending_pitch_progress = (percent, message)
+            return
+        self._show_pitch_progress(percent, message)
+        self.pitch_progress_timer.start()
+
+    def _flush_pitch_progress(self):
+        """Apply the latest progress update received during the last frame, if any."""
+        if self._pending_pitch_progress is None:
+            return
+        percent, message = self._pending_pitch_progress
+        self._pending_pitch_progress = None
+        self._show_pitch_progress(percent, message)
+        self.pitch_progress_timer.start()
+
+    def _show_pitch_progress(self, percent: int, message: str):
+        """Show a pitch detection progress update in the dialog and status bar."""
         if hasattr(self, 'pitch_progress') and self.pitch_progress:
             self.pitch_progress.setValue(percent)
             self.pitch_progress.setLabelText(message)
         self.statusBar().showMessage(f"Pitch detection: {message}")
 
+    def _cancel_pitch_progress(self):
+        """Drop progress updates still waiting for the next frame."""
+        self.pitch_progress_timer.stop()
+        self._pending_pitch_progress = None
+
     def _on_pitch_detection_complete(self, pitch_notes: list):
         """Handle completed pitch detection."""
+        self._cancel_pitch_progress()
         if hasattr(self, 'pitch_progress') and self.pitch_progress:
             self.pitch_progress.close()
 
@@ -1090,6 +1310,7 @@ class MainWindow(QMainWindow):
 
     def _on_pitch_detection_error(self, error: str):
         """Handle pitch detection error."""
+        self._cancel_pitch_progress()
         if hasattr(self, 'pitch_progress') and self.pitch_progress:
             self.pitch_progress.close()
 
@@ -1101,7 +1322,13 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def _update_preview(self):
-        """Update export preview."""
+        """Schedule an export preview update once edits pause."""
+        self.preview_timer.start()
+
+    @Slot()
+    def _do_update_preview(self):
+        """Update export preview now."""
+        self.preview_timer.stop()
         if not self.chart:
             self.preview_text.setText("Generate notes first to see preview")
             return
@@ -1155,9 +1382,8 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            content = self.template_manager.export(self.chart, template_name)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Streamed to disk, so large charts are never held as one string
+            self.template_manager.export_file(self.chart, template_name, file_path)
 
             self.statusBar().showMessage(f"Exported to {file_path}")
             QMessageBox.information(self, "Success", f"Chart exported to:\n{file_path}")
@@ -1180,6 +1406,8 @@ class MainWindow(QMainWindow):
 
         try:
             chart = self.template_manager.import_chart(file_path)
+            # Edits insert notes by bisection, so keep the chart in note order
+            chart.notes.sort(key=NOTE_SORT_KEY)
             self.chart = chart
 
             # Update UI with imported data
@@ -1200,12 +1428,7 @@ class MainWindow(QMainWindow):
 
             # Update stats
             self.tempo_label.setText(f"{chart.bpm:.1f}")
-            self.notes_label.setText(str(len(chart.notes)))
-            if chart.duration > 0:
-                density = len(chart.notes) / chart.duration
-                self.density_label.setText(f"{density:.2f}")
-            else:
-                self.density_label.setText("-")
+            self._update_chart_stats()
             self.diff_value_label.setText(f"{chart.difficulty_value}/10")
 
             # Enable export
@@ -1215,15 +1438,15 @@ class MainWindow(QMainWindow):
             # Check if we need to load audio file
             if chart.audio_file:
                 self.statusBar().showMessage(
-                    f"Imported chart with {len(chart.notes)} notes. Audio file: {chart.audio_file}"
+                    f"Imported chart with {chart.note_count} notes. Audio file: {chart.audio_file}"
                 )
             else:
-                self.statusBar().showMessage(f"Imported chart with {len(chart.notes)} notes")
+                self.statusBar().showMessage(f"Imported chart with {chart.note_count} notes")
 
             QMessageBox.information(
                 self,
                 "Import Successful",
-                f"Imported {len(chart.notes)} notes.\n\n"
+                f"Imported {chart.note_count} notes.\n\n"
                 f"Title: {chart.title}\n"
                 f"Artist: {chart.artist}\n"
                 f"BPM: {chart.bpm:.1f}\n"
@@ -1254,6 +1477,9 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Clean up on close."""
+        self._stop_playback_timers()
+        self.pitch_poll_timer.stop()
+        self.pitch_process.shutdown()
         pygame.mixer.quit()
         pygame.quit()
         event.accept()
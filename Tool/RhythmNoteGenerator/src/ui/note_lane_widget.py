@@ -5,14 +5,16 @@ Shows notes on separate lanes for editing.
 
 import numpy as np
 from PySide6.QtWidgets import QWidget, QToolTip
-from PySide6.QtCore import Qt, Signal, QRectF, QPointF
+from PySide6.QtCore import Qt, Signal, QLine, QRect, QRectF, QPointF
 from PySide6.QtGui import (
-    QPainter, QPen, QColor, QBrush, QFont,
+    QPainter, QPen, QColor, QBrush, QFont, QPixmap,
     QMouseEvent, QWheelEvent
 )
 from typing import Optional, List, Tuple
 
 from ..core.note_generator import NoteChart, Note
+from .note_window import NoteWindow
+from .repaint_throttle import RepaintThrottle
 
 
 class NoteLaneWidget(QWidget):
@@ -70,6 +72,33 @@ class NoteLaneWidget(QWidget):
 
         # Layout
         self.lane_label_width = 30
+        self.note_margin = 4  # Vertical gap between a note and its lane edges
+
+        # Repaint requests are merged to at most one paint per frame
+        self._repaint = RepaintThrottle(self)
+        # Binary-search culling of the chart's notes to the view
+        self._note_window = NoteWindow()
+        # Time grid lines, cached per (view_start, view_end, width, height)
+        self._grid_cache_key = None
+        self._grid_lines: List[QLine] = []
+        # Cached (background + lanes, lane label strip) pixmaps, keyed by size and key count
+        self._static_layers: Optional[Tuple[QPixmap, QPixmap]] = None
+        self._static_layers_key = None
+        self._build_note_styles()
+
+    def _build_note_styles(self):
+        """Pre-build the (border pen, fill brush, hold dash pen) of each note state."""
+        def style(fill: QColor, border: QColor) -> Tuple[QPen, QBrush, QPen]:
+            return QPen(border, 2), QBrush(fill), QPen(border.darker(120), 1)
+
+        self._note_styles = [style(c, c.darker(150)) for c in self.note_colors]
+        self._hovered_styles = [style(c.lighter(120), QColor(200, 200, 200))
+                                for c in self.note_colors]
+        self._selected_style = style(self.selected_color, QColor(255, 200, 0))
+
+    def _schedule_update(self, rect: Optional[QRect] = None):
+        """Request a repaint of rect (or the whole widget), throttled to the frame rate."""
+        self._repaint.request(rect)
 
     def set_chart(self, chart: NoteChart):
         """Set the note chart to display."""
@@ -77,23 +106,96 @@ class NoteLaneWidget(QWidget):
         self.num_keys = chart.num_keys
         self.duration = chart.duration
         self.selected_note_idx = None
-        self.update()
+        self._schedule_update()
+
+    def note_rect(self, note: Note) -> QRect:
+        """Widget area a note is drawn in, including its border."""
+        x = self.time_to_x(note.time)
+        y = self.lane_to_y(note.lane) + self.note_margin
+        height = self.get_lane_height() - self.note_margin * 2
+        if note.duration > 0:
+            width = max(self.time_to_x(note.time + note.duration) - x, 8)
+            rect = QRectF(x, y, width, height)
+        else:
+            rect = QRectF(x - 6, y, 12, height)
+        return rect.adjusted(-2, -2, 2, 2).toAlignedRect()
+
+    def note_inserted(self, index: int):
+        """Repaint only the area of a note just inserted into the chart at index."""
+        if self.selected_note_idx is not None and self.selected_note_idx >= index:
+            self.selected_note_idx += 1
+        if self.hovered_note_idx is not None and self.hovered_note_idx >= index:
+            self.hovered_note_idx += 1
+        self._update_notes(index)
+
+    def note_removed(self, index: int, note: Note):
+        """Repaint only the area of a note just removed from the chart at index."""
+        if self.selected_note_idx == index:
+            self.selected_note_idx = None
+        elif self.selected_note_idx is not None and self.selected_note_idx > index:
+            self.selected_note_idx -= 1
+        if self.hovered_note_idx == index:
+            self.hovered_note_idx = None
+        elif self.hovered_note_idx is not None and self.hovered_note_idx > index:
+            self.hovered_note_idx -= 1
+        self._schedule_update(self.note_rect(note))
+
+    def note_reordered(self, old_index: int, new_index: int):
+        """Keep selection and hover on the notes they were on after the chart moved
+        the note at old_index to new_index."""
+        def moved(idx: Optional[int]) -> Optional[int]:
+            if idx is None:
+                return None
+            if idx == old_index:
+                return new_index
+            if old_index < idx <= new_index:
+                return idx - 1
+            if new_index <= idx < old_index:
+                return idx + 1
+            return idx
+
+        self.selected_note_idx = moved(self.selected_note_idx)
+        self.hovered_note_idx = moved(self.hovered_note_idx)
+
+    def _update_notes(self, *indices: Optional[int]):
+        """Repaint only the areas of the notes at the given indices (None is skipped)."""
+        if not self.chart:
+            return
+        for idx in indices:
+            if idx is not None and 0 <= idx < len(self.chart.notes):
+                self._schedule_update(self.note_rect(self.chart.notes[idx]))
 
     def set_num_keys(self, num_keys: int):
         """Set number of key lanes."""
         self.num_keys = max(1, min(6, num_keys))
-        self.update()
+        self._schedule_update()
 
     def set_view_range(self, start: float, end: float):
         """Set visible time range."""
-        self.view_start = max(0, start)
-        self.view_end = min(self.duration, end)
-        self.update()
+        start = max(0, start)
+        end = min(self.duration, end)
+        # Ranges equal up to float noise (e.g. from scrollbar round trips) need no repaint
+        if abs(start - self.view_start) < 1e-9 and abs(end - self.view_end) < 1e-9:
+            return
+        self.view_start = start
+        self.view_end = end
+        self._schedule_update()
 
     def set_playback_position(self, position: float):
         """Set current playback position."""
+        if position == self.playback_position:
+            return
+        # Repaint only the strips under the old and new playhead, and nothing
+        # while it stays on the same pixel column
+        old_rect = self._playhead_rect()
         self.playback_position = position
-        self.update()
+        new_rect = self._playhead_rect()
+        if new_rect == old_rect:
+            return
+        if old_rect is not None:
+            self._schedule_update(old_rect)
+        if new_rect is not None:
+            self._schedule_update(new_rect)
 
     def get_lane_height(self) -> float:
         """Get height of each lane."""
@@ -106,6 +208,13 @@ class NoteLaneWidget(QWidget):
         ratio = (time - self.view_start) / (self.view_end - self.view_start)
         return self.lane_label_width + ratio * (self.width() - self.lane_label_width)
 
+    def times_to_x(self, times: np.ndarray) -> np.ndarray:
+        """Convert an array of times to x coordinates (vectorized time_to_x)."""
+        if self.view_end == self.view_start:
+            return np.full(len(times), float(self.lane_label_width))
+        ratio = (times - self.view_start) / (self.view_end - self.view_start)
+        return self.lane_label_width + ratio * (self.width() - self.lane_label_width)
+
     def x_to_time(self, x: float) -> float:
         """Convert x coordinate to time."""
         content_width = self.width() - self.lane_label_width
@@ -132,45 +241,78 @@ class NoteLaneWidget(QWidget):
         lane = self.y_to_lane(y)
         lane_height = self.get_lane_height()
 
-        # Search notes (reverse order to get top-most first)
-        for i in range(len(self.chart.notes) - 1, -1, -1):
-            note = self.chart.notes[i]
-            if note.lane != lane:
-                continue
-
-            note_x = self.time_to_x(note.time)
-            if note.duration > 0:
-                note_end_x = self.time_to_x(note.time + note.duration)
-                if note_x - 5 <= x <= note_end_x + 5:
-                    return i
-            else:
-                if abs(x - note_x) <= 10:
-                    return i
-
-        return None
+        # Only notes within the hit margin (10 px) of the cursor can be hit
+        arrays = self.chart.note_arrays()
+        if self.view_end > self.view_start and self.width() > self.lane_label_width:
+            candidates = self._note_window.overlapping(
+                arrays, self.x_to_time(x - 11), self.x_to_time(x + 11))
+        else:
+            candidates = np.arange(len(arrays))
+
+        # Hit-test the candidates at once; the last hit is the top-most one
+        times = arrays.times[candidates]
+        durations = arrays.durations[candidates]
+        note_x = self.time_to_x(times)
+        note_end_x = self.time_to_x(times + durations)
+        hit = (arrays.lanes[candidates] == lane) & np.where(
+            durations > 0,
+            (note_x - 5 <= x) & (x <= note_end_x + 5),  # Hold note
+            np.abs(x - note_x) <= 10                    # Tap note
+        )
+        hits = candidates[hit]
+        return int(hits[-1]) if len(hits) else None
 
     def paintEvent(self, event):
         """Draw the lane view."""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
 
-        # Background
-        painter.fillRect(self.rect(), self.bg_color)
-
-        # Draw lanes
-        self._draw_lanes(painter)
+        # Background and lanes
+        background, labels = self._get_static_layers()
+        painter.drawPixmap(0, 0, background)
 
         # Draw grid
         self._draw_grid(painter)
 
-        # Draw notes
-        self._draw_notes(painter)
+        # Draw notes (only those reaching the dirty rect)
+        self._draw_notes(painter, event.rect())
 
         # Draw playhead
         self._draw_playhead(painter)
 
-        # Draw lane labels
-        self._draw_lane_labels(painter)
+        # Draw lane labels (over notes scrolled under them)
+        painter.drawPixmap(0, 0, labels)
+
+    def _get_static_layers(self) -> Tuple[QPixmap, QPixmap]:
+        """Get the background + lanes and lane label pixmaps, rendering them on size changes."""
+        width, height = self.width(), self.height()
+        dpr = self.devicePixelRatioF()
+        key = (width, height, dpr, self.num_keys)
+        if self._static_layers is None or self._static_layers_key != key:
+            background = self._new_layer(width, height, dpr)
+            layer = QPainter(background)
+            layer.setRenderHint(QPainter.Antialiasing)
+            layer.fillRect(self.rect(), self.bg_color)
+            self._draw_lanes(layer)
+            layer.end()
+
+            labels = self._new_layer(self.lane_label_width, height, dpr)
+            layer = QPainter(labels)
+            layer.setRenderHint(QPainter.Antialiasing)
+            layer.setFont(self.font())
+            self._draw_lane_labels(layer)
+            layer.end()
+
+            self._static_layers = (background, labels)
+            self._static_layers_key = key
+        return self._static_layers
+
+    @staticmethod
+    def _new_layer(width: int, height: int, dpr: float) -> QPixmap:
+        """Create an uninitialized pixmap of the given logical size."""
+        pixmap = QPixmap(max(1, round(width * dpr)), max(1, round(height * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
 
     def _draw_lanes(self, painter: QPainter):
         """Draw lane backgrounds."""
@@ -186,6 +328,15 @@ class NoteLaneWidget(QWidget):
         """Draw time grid lines."""
         painter.setPen(QPen(self.grid_color, 1))
 
+        # Grid lines only move with the view range or widget size
+        key = (self.view_start, self.view_end, self.width(), self.height())
+        if key != self._grid_cache_key:
+            self._grid_cache_key = key
+            self._grid_lines = self._build_grid_lines()
+        painter.drawLines(self._grid_lines)
+
+    def _build_grid_lines(self) -> List[QLine]:
+        """Compute the time grid lines for the current view."""
         # Calculate grid interval
         view_width = self.view_end - self.view_start
         if view_width < 1:
@@ -197,54 +348,66 @@ class NoteLaneWidget(QWidget):
         else:
             interval = 5.0
 
+        lines = []
         t = (int(self.view_start / interval) + 1) * interval
         while t < self.view_end:
-            x = self.time_to_x(t)
-            painter.drawLine(int(x), 0, int(x), self.height())
+            x = int(self.time_to_x(t))
+            lines.append(QLine(x, 0, x, self.height()))
             t += interval
+        return lines
 
-    def _draw_notes(self, painter: QPainter):
-        """Draw all notes."""
+    def _draw_notes(self, painter: QPainter, clip: QRect):
+        """Draw the notes that overlap the view and the clip rect."""
         if not self.chart or not self.chart.notes:
             return
 
         lane_height = self.get_lane_height()
-        note_margin = 4
-
-        for i, note in enumerate(self.chart.notes):
-            if note.time > self.view_end or (note.time + note.duration) < self.view_start:
-                continue
-
-            x = self.time_to_x(note.time)
-            y = self.lane_to_y(note.lane) + note_margin
-
-            # Determine color
+        note_margin = self.note_margin
+
+        # Cull to notes overlapping the view and the clip using the chart's note arrays;
+        # the margin covers tap note width, minimum hold width and border pens
+        view_start, view_end = self.view_start, self.view_end
+        if view_end > view_start:
+            view_start = max(view_start, self.x_to_time(clip.left() - 16))
+            view_end = min(view_end, self.x_to_time(clip.right() + 16))
+        arrays = self.chart.note_arrays()
+        visible = self._note_window.overlapping(arrays, view_start, view_end)
+
+        # Note geometry for all visible notes in one vectorized pass
+        times = arrays.times[visible]
+        durations = arrays.durations[visible]
+        lanes = arrays.lanes[visible]
+        xs = self.times_to_x(times)
+        end_xs = self.times_to_x(times + durations)
+        ys = lanes * lane_height + note_margin
+
+        for i, x, end_x, y, lane, duration in zip(visible.tolist(), xs.tolist(), end_xs.tolist(),
+                                                  ys.tolist(), lanes.tolist(), durations.tolist()):
+
+            # Determine style
             if i == self.selected_note_idx:
-                color = self.selected_color
-                border_color = QColor(255, 200, 0)
+                pen, brush, dash_pen = self._selected_style
             elif i == self.hovered_note_idx:
-                color = self.note_colors[note.lane % len(self.note_colors)].lighter(120)
-                border_color = QColor(200, 200, 200)
+                pen, brush, dash_pen = self._hovered_styles[lane % len(self._hovered_styles)]
             else:
-                color = self.note_colors[note.lane % len(self.note_colors)]
-                border_color = color.darker(150)
+                pen, brush, dash_pen = self._note_styles[lane % len(self._note_styles)]
 
-            painter.setPen(QPen(border_color, 2))
-            painter.setBrush(QBrush(color))
+            painter.setPen(pen)
+            painter.setBrush(brush)
 
             height = lane_height - note_margin * 2
 
-            if note.duration > 0:
+            if duration > 0:
                 # Hold note
-                end_x = self.time_to_x(note.time + note.duration)
                 width = max(end_x - x, 8)
                 rect = QRectF(x, y, width, height)
                 painter.drawRoundedRect(rect, 4, 4)
 
-                # Draw hold indicator lines
-                painter.setPen(QPen(border_color.darker(120), 1))
-                for lx in range(int(x) + 10, int(x + width) - 5, 8):
-                    painter.drawLine(lx, int(y + 3), lx, int(y + height - 3))
+                # Draw hold indicator lines in one batch
+                painter.setPen(dash_pen)
+                top, bottom = int(y + 3), int(y + height - 3)
+                painter.drawLines([QLine(lx, top, lx, bottom)
+                                   for lx in range(int(x) + 10, int(x + width) - 5, 8)])
             else:
                 # Tap note
                 width = 12
@@ -258,6 +421,13 @@ class NoteLaneWidget(QWidget):
             painter.setPen(QPen(self.playhead_color, 2))
             painter.drawLine(int(x), 0, int(x), self.height())
 
+    def _playhead_rect(self) -> Optional[QRect]:
+        """Widget strip covered by the playhead, or None when off-screen."""
+        if not (self.view_start <= self.playback_position <= self.view_end):
+            return None
+        x = int(self.time_to_x(self.playback_position))
+        return QRect(x - 2, 0, 5, self.height())
+
     def _draw_lane_labels(self, painter: QPainter):
         """Draw lane number labels on the left."""
         lane_height = self.get_lane_height()
@@ -282,6 +452,7 @@ class NoteLaneWidget(QWidget):
         """Handle mouse press."""
         if event.button() == Qt.LeftButton:
             note_idx = self.get_note_at(event.position().x(), event.position().y())
+            previous_idx = self.selected_note_idx
 
             if note_idx is not None:
                 self.selected_note_idx = note_idx
@@ -294,7 +465,7 @@ class NoteLaneWidget(QWidget):
             else:
                 self.selected_note_idx = None
 
-            self.update()
+            self._update_notes(previous_idx, self.selected_note_idx)
 
         elif event.button() == Qt.RightButton:
             # Right click to add note
@@ -308,8 +479,8 @@ class NoteLaneWidget(QWidget):
         # Update hover state
         note_idx = self.get_note_at(event.position().x(), event.position().y())
         if note_idx != self.hovered_note_idx:
+            self._update_notes(self.hovered_note_idx, note_idx)
             self.hovered_note_idx = note_idx
-            self.update()
 
         # Show tooltip
         if note_idx is not None and self.chart:
@@ -330,9 +501,11 @@ class NoteLaneWidget(QWidget):
             # Update note position
             if self.chart:
                 note = self.chart.notes[self.selected_note_idx]
+                old_rect = self.note_rect(note)
                 note.time = new_time
                 note.lane = new_lane
-                self.update()
+                self.chart.note_changed(self.selected_note_idx)
+                self._schedule_update(old_rect.united(self.note_rect(note)))
 
     def mouseReleaseEvent(self, event: QMouseEvent):
         """Handle mouse release."""
@@ -340,16 +513,22 @@ class NoteLaneWidget(QWidget):
             self.dragging = False
             if self.selected_note_idx is not None and self.chart:
                 note = self.chart.notes[self.selected_note_idx]
-                self.note_moved.emit(self.selected_note_idx, note.time, note.lane)
+                # A plain click (select) does not move the note
+                if (note.time != self.drag_note_original_time
+                        or note.lane != self.drag_note_original_lane):
+                    self.note_moved.emit(self.selected_note_idx, note.time, note.lane)
             self.drag_start_pos = None
 
     def keyPressEvent(self, event):
         """Handle key press for note deletion."""
         if event.key() in (Qt.Key_Delete, Qt.Key_Backspace):
-            if self.selected_note_idx is not None:
-                self.note_deleted.emit(self.selected_note_idx)
-                self.selected_note_idx = None
-                self.update()
+            index = self.selected_note_idx
+            if index is not None:
+                self.note_deleted.emit(index)
+                # A handled delete already went through note_removed; otherwise just deselect
+                if self.selected_note_idx == index:
+                    self._update_notes(index)
+                    self.selected_note_idx = None
 
     def wheelEvent(self, event: QWheelEvent):
         """Handle mouse wheel for zooming."""
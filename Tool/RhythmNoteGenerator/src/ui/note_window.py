@@ -0,0 +1,45 @@
+"""
+Time-window queries over a chart's note arrays for view culling.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ..core.note_generator import NoteArray
+
+
+class NoteWindow:
+    """Finds the notes overlapping a time span by binary search.
+
+    Per-arrays data (note end times and their running maximum) is rebuilt only when
+    the chart hands out a new NoteArray or edits one in place (bumping its version).
+    """
+
+    def __init__(self):
+        self._arrays: Optional[NoteArray] = None
+        self._version = -1
+        self._ends = np.empty(0)
+        self._end_max: Optional[np.ndarray] = None  # None when times are not sorted
+
+    def overlapping(self, arrays: NoteArray, start: float, end: float) -> np.ndarray:
+        """Indices of notes with time <= end and time + duration >= start, in chart order."""
+        if arrays is not self._arrays or arrays.version != self._version:
+            self._arrays = arrays
+            self._version = arrays.version
+            self._ends = arrays.times + arrays.durations
+            times = arrays.times
+            # A drag can leave notes briefly out of order; those fall back to a full mask
+            self._end_max = (np.maximum.accumulate(self._ends)
+                             if np.all(times[1:] >= times[:-1]) else None)
+
+        times, ends = arrays.times, self._ends
+        if self._end_max is None:
+            return np.flatnonzero((times <= end) & (ends >= start))
+
+        # Notes before lo all end before start; notes from hi on start after end
+        lo = int(np.searchsorted(self._end_max, start, side='left'))
+        hi = int(np.searchsorted(times, end, side='right'))
+        if hi <= lo:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(ends[lo:hi] >= start) + lo
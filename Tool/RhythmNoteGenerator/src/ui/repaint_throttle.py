@@ -0,0 +1,57 @@
+"""
+Frame-rate throttling of widget repaint requests.
+"""
+
+from typing import Optional
+
+from PySide6.QtCore import QObject, QRect, QTimer
+from PySide6.QtGui import QRegion
+from PySide6.QtWidgets import QWidget
+
+
+class RepaintThrottle(QObject):
+    """Limits a widget to one repaint per frame interval.
+
+    A request made while idle repaints immediately; requests arriving within the
+    next interval are merged (full repaint, or the union of the requested rects)
+    and issued together when it ends.
+    """
+
+    FRAME_INTERVAL_MS = 16  # ~60 Hz
+
+    def __init__(self, widget: QWidget):
+        super().__init__(widget)
+        self._widget = widget
+        self._full_pending = False
+        self._pending_region = QRegion()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self._flush)
+
+    def request(self, rect: Optional[QRect] = None):
+        """Request a repaint of rect, or of the whole widget when rect is None."""
+        if not self._timer.isActive():
+            # Idle: repaint now and hold further requests for one frame
+            if rect is None:
+                self._widget.update()
+            else:
+                self._widget.update(rect)
+            self._timer.start()
+        elif rect is None:
+            self._full_pending = True
+        elif not self._full_pending:
+            self._pending_region = self._pending_region.united(rect)
+
+    def _flush(self):
+        """Issue the requests merged during the last frame, if any."""
+        if self._full_pending:
+            self._widget.update()
+        elif not self._pending_region.isEmpty():
+            self._widget.update(self._pending_region)
+        else:
+            return
+        self._full_pending = False
+        self._pending_region = QRegion()
+        self._timer.start()
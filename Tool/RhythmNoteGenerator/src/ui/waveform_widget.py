@@ -4,12 +4,14 @@ Waveform visualization widget for audio display.
 
 import numpy as np
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt, Signal, QRectF
+from PySide6.QtCore import Qt, Signal, QLine, QRect, QRectF
 from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QPainterPath
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from ..core.audio_analyzer import AudioAnalysisResult
-from ..core.note_generator import NoteChart
+from ..core.note_generator import NoteChart, Note
+from .note_window import NoteWindow
+from .repaint_throttle import RepaintThrottle
 
 
 class WaveformWidget(QWidget):
@@ -55,34 +57,76 @@ class WaveformWidget(QWidget):
         self.playhead_color = QColor(255, 255, 255)
         self.grid_color = QColor(60, 60, 70)
 
+        # Repaint requests are merged to at most one paint per frame
+        self._repaint = RepaintThrottle(self)
+        # Binary-search culling of the chart's notes to the view
+        self._note_window = NoteWindow()
+        # Time grid lines, cached per (view_start, view_end, width, height)
+        self._grid_cache_key = None
+        self._grid_lines: List[QLine] = []
+        # Per-lane note (pen, brush), built once instead of per painted note
+        self._note_styles = [(QPen(c.darker(120), 1), QBrush(c)) for c in self.note_colors]
+
+    def _schedule_update(self, rect: Optional[QRect] = None):
+        """Request a repaint of rect (or the whole widget), throttled to the frame rate."""
+        self._repaint.request(rect)
+
     def set_analysis(self, analysis: AudioAnalysisResult):
         """Set audio analysis data."""
         self.analysis = analysis
         self.view_start = 0.0
         self.view_end = min(10.0, analysis.duration)
         self._waveform_cache = None
-        self.update()
+        self._schedule_update()
 
     def set_chart(self, chart: NoteChart):
         """Set note chart data."""
         self.chart = chart
-        self.update()
+        self._schedule_update()
 
     def set_view_range(self, start: float, end: float):
         """Set the visible time range."""
         if self.analysis:
             start = max(0, start)
             end = min(self.analysis.duration, end)
+            # Ranges equal up to float noise (e.g. from scrollbar round trips) need no repaint
+            if abs(start - self.view_start) < 1e-9 and abs(end - self.view_end) < 1e-9:
+                return
             if end > start:
                 self.view_start = start
                 self.view_end = end
                 self._waveform_cache = None
-                self.update()
+                self._schedule_update()
+
+    def update_note_area(self, note: Note):
+        """Repaint only the area a note marker is drawn in."""
+        if not self.chart:
+            return
+        note_height = self.height() / max(self.chart.num_keys, 1)
+        x = self.time_to_x(note.time)
+        y = note.lane * note_height
+        if note.duration > 0:
+            width = max(self.time_to_x(note.time + note.duration) - x, 4)
+            rect = QRectF(x, y + 2, width, note_height - 4)
+        else:
+            rect = QRectF(x - 2, y + 2, 4, note_height - 4)
+        self._schedule_update(rect.adjusted(-2, -2, 2, 2).toAlignedRect())
 
     def set_playback_position(self, position: float):
         """Set current playback position."""
+        if position == self.playback_position:
+            return
+        # Repaint only the strips under the old and new playhead, and nothing
+        # while it stays on the same pixel column
+        old_rect = self._playhead_rect()
         self.playback_position = position
-        self.update()
+        new_rect = self._playhead_rect()
+        if new_rect == old_rect:
+            return
+        if old_rect is not None:
+            self._schedule_update(old_rect)
+        if new_rect is not None:
+            self._schedule_update(new_rect)
 
     def zoom(self, factor: float, center: Optional[float] = None):
         """Zoom in/out centered on a time position."""
@@ -118,6 +162,13 @@ class WaveformWidget(QWidget):
         ratio = (time - self.view_start) / (self.view_end - self.view_start)
         return ratio * self.width()
 
+    def times_to_x(self, times: np.ndarray) -> np.ndarray:
+        """Convert an array of times to x coordinates (vectorized time_to_x)."""
+        if self.view_end == self.view_start:
+            return np.zeros(len(times))
+        ratio = (times - self.view_start) / (self.view_end - self.view_start)
+        return ratio * self.width()
+
     def x_to_time(self, x: float) -> float:
         """Convert x coordinate to time."""
         ratio = x / self.width() if self.width() > 0 else 0
@@ -136,18 +187,21 @@ class WaveformWidget(QWidget):
             painter.drawText(self.rect(), Qt.AlignCenter, "Load an audio file to see waveform")
             return
 
+        # Only the dirty rect needs redrawing (e.g. the strips around a moved playhead)
+        clip = event.rect()
+
         # Draw grid
         self._draw_grid(painter)
 
         # Draw waveform
-        self._draw_waveform(painter)
+        self._draw_waveform(painter, clip)
 
         # Draw beat markers
-        self._draw_beats(painter)
+        self._draw_beats(painter, clip)
 
         # Draw notes
         if self.chart:
-            self._draw_notes(painter)
+            self._draw_notes(painter, clip)
 
         # Draw playhead
         self._draw_playhead(painter)
@@ -159,6 +213,15 @@ class WaveformWidget(QWidget):
         """Draw time grid."""
         painter.setPen(QPen(self.grid_color, 1))
 
+        # Grid lines only move with the view range or widget size
+        key = (self.view_start, self.view_end, self.width(), self.height())
+        if key != self._grid_cache_key:
+            self._grid_cache_key = key
+            self._grid_lines = self._build_grid_lines()
+        painter.drawLines(self._grid_lines)
+
+    def _build_grid_lines(self) -> List[QLine]:
+        """Compute the time grid lines for the current view."""
         # Calculate appropriate grid interval
         view_width = self.view_end - self.view_start
         if view_width < 1:
@@ -172,14 +235,22 @@ class WaveformWidget(QWidget):
         else:
             interval = 10.0
 
+        lines = []
         t = (int(self.view_start / interval) + 1) * interval
         while t < self.view_end:
-            x = self.time_to_x(t)
-            painter.drawLine(int(x), 0, int(x), self.height())
+            x = int(self.time_to_x(t))
+            lines.append(QLine(x, 0, x, self.height()))
             t += interval
+        return lines
+
+    def _clip_time_range(self, clip: QRect, margin: int) -> Tuple[float, float]:
+        """Time span drawn into the clip rect, widened by margin pixels on each side."""
+        if self.view_end <= self.view_start:
+            return self.view_start - 1, self.view_end + 1
+        return self.x_to_time(clip.left() - margin), self.x_to_time(clip.right() + margin)
 
-    def _draw_waveform(self, painter: QPainter):
-        """Draw audio waveform."""
+    def _draw_waveform(self, painter: QPainter, clip: QRect):
+        """Draw audio waveform (only the columns inside clip)."""
         if self.analysis.waveform is None or len(self.analysis.waveform) == 0:
             return
 
@@ -204,10 +275,14 @@ class WaveformWidget(QWidget):
         center_y = self.height() / 2
         scale = self.height() * 0.4
 
+        # Columns covering the clip, with a margin so the closing edges stay outside it
+        first = max(0, clip.left() - 2)
+        last = min(width, clip.right() + 3)
+
         path = QPainterPath()
-        path.moveTo(0, center_y)
+        path.moveTo(first, center_y)
 
-        for i in range(width):
+        for i in range(first, last):
             sample_start = i * samples_per_pixel
             sample_end = min(sample_start + samples_per_pixel, len(waveform))
 
@@ -222,7 +297,7 @@ class WaveformWidget(QWidget):
                 path.lineTo(i, y)
 
         # Mirror for bottom half
-        for i in range(width - 1, -1, -1):
+        for i in range(last - 1, first - 1, -1):
             sample_start = i * samples_per_pixel
             sample_end = min(sample_start + samples_per_pixel, len(waveform))
 
@@ -241,39 +316,51 @@ class WaveformWidget(QWidget):
         painter.setBrush(QBrush(self.waveform_color))
         painter.drawPath(path)
 
-    def _draw_beats(self, painter: QPainter):
+    def _draw_beats(self, painter: QPainter, clip: QRect):
         """Draw beat markers."""
         if self.analysis.beat_times is None:
             return
 
         painter.setPen(QPen(self.beat_color, 2))
 
-        for beat_time in self.analysis.beat_times:
-            if self.view_start <= beat_time <= self.view_end:
-                x = self.time_to_x(beat_time)
-                painter.drawLine(int(x), 0, int(x), self.height())
+        beat_times = self.analysis.beat_times
+        clip_start, clip_end = self._clip_time_range(clip, 4)
+        visible = ((beat_times >= max(self.view_start, clip_start)) &
+                   (beat_times <= min(self.view_end, clip_end)))
+        for beat_time in beat_times[visible].tolist():
+            x = self.time_to_x(beat_time)
+            painter.drawLine(int(x), 0, int(x), self.height())
 
-    def _draw_notes(self, painter: QPainter):
+    def _draw_notes(self, painter: QPainter, clip: QRect):
         """Draw note markers."""
         if not self.chart or not self.chart.notes:
             return
 
         note_height = self.height() / max(self.chart.num_keys, 1)
 
-        for note in self.chart.notes:
-            if note.time < self.view_start - 1 or note.time > self.view_end + 1:
-                continue
+        # Cull to notes near the view and the clip using the chart's note arrays
+        arrays = self.chart.note_arrays()
+        clip_start, clip_end = self._clip_time_range(clip, 8)
+        visible = self._note_window.overlapping(arrays, clip_start, min(self.view_end + 1, clip_end))
+        visible = visible[arrays.times[visible] >= self.view_start - 1]
 
-            x = self.time_to_x(note.time)
-            y = note.lane * note_height
+        # Note geometry for all visible notes in one vectorized pass
+        times = arrays.times[visible]
+        durations = arrays.durations[visible]
+        lanes = arrays.lanes[visible]
+        xs = self.times_to_x(times)
+        end_xs = self.times_to_x(times + durations)
+        ys = lanes * note_height
 
-            color = self.note_colors[note.lane % len(self.note_colors)]
-            painter.setPen(QPen(color.darker(120), 1))
-            painter.setBrush(QBrush(color))
+        for x, end_x, y, lane, duration in zip(xs.tolist(), end_xs.tolist(), ys.tolist(),
+                                               lanes.tolist(), durations.tolist()):
 
-            if note.duration > 0:
+            pen, brush = self._note_styles[lane % len(self._note_styles)]
+            painter.setPen(pen)
+            painter.setBrush(brush)
+
+            if duration > 0:
                 # Hold note - draw as rectangle
-                end_x = self.time_to_x(note.time + note.duration)
                 width = max(end_x - x, 4)
                 painter.drawRect(QRectF(x, y + 2, width, note_height - 4))
             else:
@@ -287,6 +374,13 @@ class WaveformWidget(QWidget):
             painter.setPen(QPen(self.playhead_color, 2))
             painter.drawLine(int(x), 0, int(x), self.height())
 
+    def _playhead_rect(self) -> Optional[QRect]:
+        """Widget strip covered by the playhead, or None when off-screen."""
+        if not (self.view_start <= self.playback_position <= self.view_end):
+            return None
+        x = int(self.time_to_x(self.playback_position))
+        return QRect(x - 2, 0, 5, self.height())
+
     def _draw_time_labels(self, painter: QPainter):
         """Draw time labels."""
         painter.setPen(QColor(180, 180, 180))
@@ -0,0 +1,13 @@
+"""
+Test configuration: make the `src` package importable the same way run.py does,
+and run Qt and pygame headless.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,71 @@
+"""
+Tests for audio analysis helpers.
+"""
+
+import numpy as np
+import librosa
+
+from src.core.audio_analyzer import AudioAnalyzer
+
+
+def _group_frames_loop(analyzer, times, f0, voiced_flag, voiced_probs, min_duration):
+    """Reference frame grouping: one pass over the frames, as detect_pitches used to do."""
+    notes = []
+    current_note = None
+    current_start = None
+    freqs, probs = [], []
+    for time, freq, voiced, prob in zip(times, f0, voiced_flag, voiced_probs):
+        if voiced and not np.isnan(freq):
+            midi = round(librosa.hz_to_midi(freq))
+            if current_note is None or midi != current_note:
+                if current_note is not None and time - current_start >= min_duration:
+                    notes.append(analyzer._create_pitch_note(current_start, time - current_start,
+                                                             np.array(freqs), np.array(probs)))
+                current_note, current_start = midi, time
+                freqs, probs = [freq], [prob]
+            else:
+                freqs.append(freq)
+                probs.append(prob)
+        elif current_note is not None:
+            if time - current_start >= min_duration:
+                notes.append(analyzer._create_pitch_note(current_start, time - current_start,
+                                                         np.array(freqs), np.array(probs)))
+            current_note = None
+    if current_note is not None and times[-1] - current_start >= min_duration:
+        notes.append(analyzer._create_pitch_note(current_start, times[-1] - current_start,
+                                                 np.array(freqs), np.array(probs)))
+    return notes
+
+
+def _random_pitch_track(rng, num_frames):
+    """Piecewise-constant pitches with jitter, unvoiced gaps and NaNs."""
+    runs = rng.integers(1, 12, num_frames)
+    pitches = np.repeat(rng.choice([220.0, 233.1, 246.9, 440.0, 880.0], len(runs)), runs)[:num_frames]
+    f0 = pitches * (1 + rng.normal(0, 0.01, num_frames))
+    voiced_flag = rng.random(num_frames) > 0.15
+    f0[rng.random(num_frames) < 0.05] = np.nan
+    voiced_probs = rng.random(num_frames)
+    return f0, voiced_flag, voiced_probs
+
+
+def test_group_pitch_frames_matches_frame_loop():
+    analyzer = AudioAnalyzer(use_disk_cache=False)
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        num_frames = int(rng.integers(1, 300))
+        times = np.arange(num_frames) * (512 / 22050)
+        f0, voiced_flag, voiced_probs = _random_pitch_track(rng, num_frames)
+        min_duration = float(rng.choice([0.0, 0.05, 0.1]))
+
+        expected = _group_frames_loop(analyzer, times, f0, voiced_flag, voiced_probs, min_duration)
+        notes = analyzer._group_pitch_frames(times, f0, voiced_flag, voiced_probs, min_duration)
+        assert notes == expected
+
+
+def test_group_pitch_frames_without_voiced_frames():
+    analyzer = AudioAnalyzer(use_disk_cache=False)
+    times = np.arange(5) * 0.1
+    assert analyzer._group_pitch_frames(times, np.full(5, np.nan), np.zeros(5, bool),
+                                        np.zeros(5), 0.05) == []
+    assert analyzer._group_pitch_frames(np.empty(0), np.empty(0), np.empty(0, bool),
+                                        np.empty(0), 0.05) == []
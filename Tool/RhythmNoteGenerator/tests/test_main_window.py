@@ -0,0 +1,106 @@
+"""
+Tests for chart editing in the main window.
+"""
+
+from time import perf_counter
+
+import numpy as np
+import pygame
+import pytest
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QPushButton
+
+from src.core.note_generator import Note, NoteChart
+from src.ui.main_window import MainWindow
+
+
+@pytest.fixture
+def window():
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    window.resize(1400, 900)
+    window.show()
+    window.chart = NoteChart(duration=10.0, notes=[Note(float(i + 1), i % 4, 0.0) for i in range(8)])
+    window.lane_widget.set_chart(window.chart)
+    window.waveform_widget.set_chart(window.chart)
+    window.lane_widget.set_view_range(0.0, 10.0)
+    app.processEvents()
+    yield window
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def _note_pos(lane_widget, note: Note) -> QPoint:
+    y = lane_widget.lane_to_y(note.lane) + lane_widget.get_lane_height() / 2
+    return QPoint(int(lane_widget.time_to_x(note.time)), int(y))
+
+
+def test_click_then_delete_removes_note(window):
+    lane_widget = window.lane_widget
+    target = window.chart.notes[3]
+    QTest.mouseClick(lane_widget, Qt.LeftButton, Qt.NoModifier, _note_pos(lane_widget, target))
+    assert lane_widget.selected_note_idx == 3
+
+    QTest.keyClick(lane_widget, Qt.Key_Delete)
+    assert len(window.chart.notes) == 7
+    assert target not in window.chart.notes
+
+
+def test_drag_past_neighbours_keeps_order_and_selection(window):
+    lane_widget = window.lane_widget
+    dragged = window.chart.notes[1]
+    start = _note_pos(lane_widget, dragged)
+    end = QPoint(int(lane_widget.time_to_x(5.5)), start.y())
+    QTest.mousePress(lane_widget, Qt.LeftButton, Qt.NoModifier, start)
+    QTest.mouseMove(lane_widget, end)
+    QTest.mouseRelease(lane_widget, Qt.LeftButton, Qt.NoModifier, end)
+
+    times = [note.time for note in window.chart.notes]
+    assert times == sorted(times)
+    assert window.chart.notes[lane_widget.selected_note_idx] is dragged
+    assert window.chart.note_arrays().times.tolist() == times
+
+
+def test_music_resyncs_after_the_queue_runs_dry(window):
+    rate = pygame.mixer.get_init()[0]
+    window.music_pcm = np.zeros((rate * 20, 2), dtype=np.int16)
+    window.playback_offset = 0.0
+    window.playback_start_time = perf_counter()
+    window._play_music_from(0.0)
+    assert window._music_next_frame == 2 * window._music_chunk_frames
+
+    # Simulate a stall: both pieces finished while nothing refilled the queue
+    window.music_channel.stop()
+    window.playback_start_time -= 7.0
+    window._queue_music_chunk()
+
+    assert window.music_channel.get_busy()
+    expected = 7.0 * rate + 2 * window._music_chunk_frames  # Playing piece plus the queued one
+    assert abs(window._music_next_frame - expected) < 0.1 * rate
+
+
+class _StalledResult:
+    """AsyncResult of a worker that died: never becomes ready."""
+
+    def ready(self):
+        return False
+
+
+def test_cancel_abandons_stalled_pitch_detection(window, monkeypatch):
+    shutdowns = []
+    monkeypatch.setattr(window.pitch_process, "submit", lambda *args: _StalledResult())
+    monkeypatch.setattr(window.pitch_process, "shutdown", lambda: shutdowns.append(True))
+    window.current_file = "song.wav"
+    window.analysis = object()
+
+    window._detect_pitches()
+    assert window.pitch_poll_timer.isActive()
+    assert not window.detect_pitch_btn.isEnabled()
+
+    QTest.mouseClick(window.pitch_progress.findChild(QPushButton), Qt.LeftButton)
+    assert not window.pitch_poll_timer.isActive()
+    assert shutdowns == [True]
+    assert window.detect_pitch_btn.isEnabled()
+    assert window.detect_pitch_btn.text() == "Detect Pitches"
@@ -0,0 +1,77 @@
+"""
+Tests for note generation helpers.
+"""
+
+import numpy as np
+
+from src.core.audio_analyzer import AudioAnalysisResult
+from src.core.note_generator import (Difficulty, NoteGenerator, _enforce_min_interval,
+                                     _thin_by_interval)
+
+
+def _analysis(frame_period: float, energy: np.ndarray, beat_times=()) -> AudioAnalysisResult:
+    """Build a minimal analysis result with the given per-frame energy."""
+    times = np.arange(len(energy)) * frame_period
+    return AudioAnalysisResult(
+        duration=float(times[-1]), sample_rate=22050, tempo=120.0,
+        beat_times=np.asarray(beat_times, dtype=np.float64), onset_times=np.empty(0),
+        times=times.astype(np.float32), energy=np.asarray(energy, dtype=np.float32),
+        waveform=np.zeros(16, dtype=np.float32), waveform_sr=100.0,
+    )
+
+
+def test_space_notes_keeps_strongest_note_within_one_frame():
+    frame_period = 0.1
+    energy = np.zeros(50)
+    energy[20] = 1.0  # 2.0 s is loud, 2.04 s is interpolated halfway towards quiet
+    analysis = _analysis(frame_period, energy)
+    generator = NoteGenerator(difficulty=Difficulty.NORMAL, seed=0)
+
+    # Both notes round to frame 20; the weaker one comes last
+    assert list(generator._space_notes(np.array([2.0, 2.04]), analysis)) == [2.0]
+
+    # Stronger note last: it must still win
+    energy[20], energy[21] = 0.0, 1.0
+    analysis = _analysis(frame_period, energy)
+    assert list(generator._space_notes(np.array([1.96, 2.04]), analysis)) == [2.04]
+
+
+def _greedy_thin(times, min_interval):
+    """Reference min-interval thinning: keep a time if it is far enough from the last kept one."""
+    kept = []
+    for t in times:
+        if not kept or t - kept[-1] >= min_interval:
+            kept.append(t)
+    return kept
+
+
+def test_enforce_min_interval_matches_greedy_thinning():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        times = np.sort(rng.uniform(0, 30, rng.integers(0, 200)))
+        min_interval = float(rng.choice([0.05, 0.1, 0.3, 0.5]))
+        expected = _greedy_thin(times.tolist(), min_interval)
+        assert _enforce_min_interval(times, min_interval).tolist() == expected
+        assert _thin_by_interval(times, min_interval).tolist() == expected
+
+
+def test_enforce_min_interval_keeps_spaced_input():
+    times = np.arange(10) * 0.5
+    assert _enforce_min_interval(times, 0.5).tolist() == times.tolist()
+
+
+def test_space_notes_output_is_spaced_subset():
+    rng = np.random.default_rng(1)
+    frame_period = 512 / 22050
+    for difficulty in (Difficulty.EASY, Difficulty.NORMAL, Difficulty.HARD):
+        generator = NoteGenerator(difficulty=difficulty, seed=0)
+        min_interval = generator.params['min_interval']
+        for _ in range(50):
+            energy = rng.random(2000)
+            note_times = np.unique(rng.uniform(0, 40, rng.integers(2, 300)))
+            beat_times = note_times[rng.random(len(note_times)) < 0.3]
+            analysis = _analysis(frame_period, energy, beat_times)
+
+            spaced = generator._space_notes(note_times, analysis)
+            assert np.all(np.isin(spaced, note_times))
+            assert np.all(np.diff(spaced) >= min_interval)
@@ -0,0 +1,44 @@
+"""
+Tests for time-window note queries.
+"""
+
+import numpy as np
+
+from src.core.note_generator import Note, NoteArray, NoteChart
+from src.ui.note_window import NoteWindow
+
+
+def _overlapping_mask(arrays: NoteArray, start: float, end: float) -> list:
+    ends = arrays.times + arrays.durations
+    return np.flatnonzero((arrays.times <= end) & (ends >= start)).tolist()
+
+
+def _random_arrays(rng, count: int, sort: bool) -> NoteArray:
+    times = rng.uniform(0, 60, count)
+    if sort:
+        times.sort()
+    durations = np.where(rng.random(count) < 0.3, rng.uniform(0, 8, count), 0.0)
+    return NoteArray(times, rng.integers(0, 6, count), durations)
+
+
+def test_overlapping_matches_mask():
+    rng = np.random.default_rng(0)
+    window = NoteWindow()
+    for sort in (True, False):
+        for _ in range(100):
+            arrays = _random_arrays(rng, int(rng.integers(0, 300)), sort)
+            for _ in range(10):
+                start = rng.uniform(-5, 65)
+                end = start + rng.uniform(0, 15)
+                assert window.overlapping(arrays, start, end).tolist() == \
+                    _overlapping_mask(arrays, start, end)
+
+
+def test_overlapping_follows_in_place_edits():
+    chart = NoteChart(notes=[Note(float(i), 0, 0.0) for i in range(10)])
+    window = NoteWindow()
+    assert window.overlapping(chart.note_arrays(), 4.5, 5.5).tolist() == [5]
+
+    chart.notes[2].time = 5.2
+    chart.note_changed(2)
+    assert window.overlapping(chart.note_arrays(), 4.5, 5.5).tolist() == [2, 5]
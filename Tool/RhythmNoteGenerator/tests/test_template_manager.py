@@ -0,0 +1,123 @@
+"""
+Tests for template rendering and chart export/import.
+"""
+
+from string import Template
+
+import numpy as np
+import pytest
+import yaml
+
+from src.core.note_generator import Difficulty, Note, NoteChart
+from src.core.template_manager import (CHART_VARS, TemplateManager, _YAMLDumper,
+                                       _to_format_string)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return TemplateManager(tmp_path)
+
+
+def _random_chart(rng, num_notes: int) -> NoteChart:
+    times = np.round(np.sort(rng.uniform(0, 180, num_notes)), 4)
+    lanes = rng.integers(0, 6, num_notes)
+    durations = np.where(rng.random(num_notes) < 0.2, np.round(rng.uniform(0.1, 2, num_notes), 4), 0.0)
+    return NoteChart(
+        title='Song: "Test" {1}', artist='Artist $x', audio_file='song.ogg',
+        bpm=128.5, offset=0.25, duration=181.0, num_keys=6,
+        difficulty=Difficulty.HARD, difficulty_value=7,
+        notes=[Note(float(t), int(l), float(d)) for t, l, d in zip(times, lanes, durations)],
+    )
+
+
+def _note_tuples(chart: NoteChart) -> list:
+    return [(round(n.time, 4), n.lane, round(n.duration, 4)) for n in chart.notes]
+
+
+def test_to_format_string_matches_safe_substitute():
+    values = {'title': 'T {x}', 'artist': '$A', 'bpm': 120.0, 'num_keys': 4}
+    pieces = ['$title', '${artist}', '$$', '$bpm', '${num_keys}', '$unknown', '${unknown}',
+              '{', '}', '{{', '$', ' text ', '\n', '$1', '${', 'bpm']
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        text = ''.join(rng.choice(pieces, rng.integers(0, 8)))
+        expected = Template(text).safe_substitute(values)
+        assert _to_format_string(text, CHART_VARS).format_map(values) == expected, text
+
+
+def test_yaml_export_matches_full_dumper(manager):
+    rng = np.random.default_rng(1)
+    for num_notes in (0, 1, 50, 5000):
+        chart = _random_chart(rng, num_notes)
+        expected = yaml.dump(chart.to_dict(), Dumper=_YAMLDumper, default_flow_style=False,
+                             allow_unicode=True, sort_keys=False)
+        assert manager.export(chart, 'yaml') == expected
+
+
+@pytest.mark.parametrize('template_name, importer', [
+    ('yaml', '_import_yaml'),
+    ('json', '_import_json'),
+    ('csv', '_import_csv'),
+    ('simple', '_import_text'),
+])
+def test_export_import_round_trip(manager, template_name, importer):
+    rng = np.random.default_rng(2)
+    for num_notes in (0, 1, 50, 5000):
+        chart = _random_chart(rng, num_notes)
+        imported = getattr(manager, importer)(manager.export(chart, template_name))
+        assert _note_tuples(imported) == _note_tuples(chart)
+        assert imported.num_keys == chart.num_keys
+        assert imported.difficulty == chart.difficulty
+
+
+def test_minimal_export_round_trip_in_milliseconds(manager):
+    chart = NoteChart(notes=[Note(1.5, 0, 0.0), Note(2.25, 3, 0.0), Note(61.0, 1, 0.0)])
+    imported = manager._import_text(manager.export(chart, 'minimal'))
+    assert _note_tuples(imported) == _note_tuples(chart)
+
+
+def _parse_csv_notes_by_line(lines):
+    notes = []
+    for line in lines:
+        parts = line.split(',')
+        if len(parts) >= 2:
+            notes.append(Note(float(parts[0]), int(parts[1]),
+                              float(parts[2]) if len(parts) > 2 else 0.0))
+    return notes
+
+
+def test_parse_csv_notes_matches_line_parser(manager):
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        count = int(rng.integers(1, 40))
+        columns = int(rng.choice([2, 3]))
+        lines = [','.join([f'{rng.uniform(0, 100):.4f}', str(rng.integers(0, 6)),
+                           f'{rng.uniform(0, 2):.4f}'][:columns]) for _ in range(count)]
+        if rng.random() < 0.3:
+            lines.append('5.0,1,0.5,extra')  # Ragged file takes the line-by-line path
+        assert manager._parse_csv_notes(lines) == _parse_csv_notes_by_line(lines)
+
+
+def _parse_text_note_by_separator(manager, line):
+    for sep in ['|', ':', ',', '\t', ' ']:
+        if sep in line:
+            parts = [p.strip() for p in line.split(sep) if p.strip()]
+            if len(parts) >= 2:
+                try:
+                    return manager._text_note(parts[0], parts[1], parts[2] if len(parts) > 2 else None)
+                except (ValueError, IndexError):
+                    continue
+    return None
+
+
+def test_parse_text_note_matches_separator_parser(manager):
+    rng = np.random.default_rng(4)
+    for _ in range(500):
+        sep = str(rng.choice(['|', ':', ',', '\t', ' ', ' | ']))
+        fields = [f'{rng.uniform(0, 5000):.{rng.integers(0, 5)}f}', str(rng.integers(0, 6))]
+        if rng.random() < 0.5:
+            fields.append(f'{rng.uniform(0, 500):.{rng.integers(0, 4)}f}')
+        line = sep.join(fields)
+        assert manager._parse_text_note(line) == _parse_text_note_by_separator(manager, line), line
+    for line in ('title=Song', 'abc', '1|x', ''):
+        assert manager._parse_text_note(line) == _parse_text_note_by_separator(manager, line)